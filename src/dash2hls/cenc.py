@@ -0,0 +1,370 @@
+"""In-process Common Encryption (ISO/IEC 23001-7) decryption of fragmented MP4."""
+
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass, replace
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+from Crypto.Cipher import AES
+
+# Bytes between a sample entry's header and its child boxes.
+_SAMPLE_ENTRY_FIELDS = {b"encv": 78, b"enca": 28}
+
+# Flags of the track fragment header (tfhd) and track run (trun) boxes.
+_TFHD_BASE_DATA_OFFSET = 0x000001
+_TFHD_SAMPLE_DESCRIPTION_INDEX = 0x000002
+_TFHD_DEFAULT_SAMPLE_DURATION = 0x000008
+_TFHD_DEFAULT_SAMPLE_SIZE = 0x000010
+_TFHD_DEFAULT_BASE_IS_MOOF = 0x020000
+_TRUN_DATA_OFFSET = 0x000001
+_TRUN_FIRST_SAMPLE_FLAGS = 0x000004
+_TRUN_SAMPLE_DURATION = 0x000100
+_TRUN_SAMPLE_SIZE = 0x000200
+_TRUN_SAMPLE_FLAGS = 0x000400
+_TRUN_SAMPLE_CTS_OFFSET = 0x000800
+_SENC_USE_SUBSAMPLES = 0x000002
+
+
+class UnsupportedEncryption(ValueError):
+    """Raised for content this module cannot decrypt (e.g. the cbcs scheme)."""
+
+
+@dataclass(frozen=True)
+class TrackEncryption:
+    """Protection parameters of one track, read from its init segment."""
+
+    track_id: int
+    scheme: str
+    kid: str
+    iv_size: int
+    is_protected: bool = True
+    constant_iv: bytes = b""
+    default_sample_size: int = 0
+
+
+@dataclass
+class _Box:
+    type: bytes
+    start: int
+    body: int
+    end: int
+
+
+def _iter_boxes(data: memoryview, start: int, end: int) -> Iterator[_Box]:
+    pos = start
+    while pos + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", data, pos)
+        body = pos + 8
+        if size == 1:
+            (size,) = struct.unpack_from(">Q", data, body)
+            body += 8
+        elif size == 0:
+            size = end - pos
+        if size < body - pos or pos + size > end:
+            raise UnsupportedEncryption(f"Malformed {box_type!r} box at offset {pos}")
+        yield _Box(box_type, pos, body, pos + size)
+        pos += size
+
+
+def _find(data: memoryview, parent: _Box, box_type: bytes) -> Optional[_Box]:
+    return next((box for box in _iter_boxes(data, parent.body, parent.end) if box.type == box_type), None)
+
+
+def _full_box(data: memoryview, box: _Box) -> Tuple[int, int]:
+    (version_flags,) = struct.unpack_from(">I", data, box.body)
+    return version_flags >> 24, version_flags & 0xFFFFFF
+
+
+def is_init_segment(data: bytes) -> bool:
+    """Whether the payload carries a ``moov`` box (an initialization segment)."""
+    view = memoryview(data)
+    try:
+        return any(box.type == b"moov" for box in _iter_boxes(view, 0, len(view)))
+    except UnsupportedEncryption:
+        return False
+
+
+def clear_init_segment(data: bytes) -> Tuple[bytes, List[TrackEncryption]]:
+    """
+    Turn a protected initialization segment into a clear one.
+
+    Encrypted sample entries (``encv``/``enca``) get their original format back
+    from ``frma``, and the ``sinf`` and ``pssh`` boxes are renamed to ``free``
+    so no box sizes or offsets change.
+
+    Args:
+        data: Initialization segment as downloaded
+
+    Returns:
+        Clear initialization segment and the protection info of each track
+    """
+    out = bytearray(data)
+    view = memoryview(data)
+    tracks: List[TrackEncryption] = []
+    trex_sizes: Dict[int, int] = {}
+
+    for box in _iter_boxes(view, 0, len(view)):
+        if box.type != b"moov":
+            continue
+        for child in _iter_boxes(view, box.body, box.end):
+            if child.type == b"pssh":
+                out[child.start + 4:child.start + 8] = b"free"
+            elif child.type == b"trak":
+                track = _clear_track(view, out, child)
+                if track is not None:
+                    tracks.append(track)
+            elif child.type == b"mvex":
+                for trex in _iter_boxes(view, child.body, child.end):
+                    if trex.type == b"trex":
+                        track_id, _, _, size = struct.unpack_from(">IIII", view, trex.body + 4)
+                        trex_sizes[track_id] = size
+
+    tracks = [replace(t, default_sample_size=trex_sizes.get(t.track_id, 0)) for t in tracks]
+    return bytes(out), tracks
+
+
+def _clear_track(view: memoryview, out: bytearray, trak: _Box) -> Optional[TrackEncryption]:
+    """Restore a track's sample entries; tracks without protection report is_protected=False."""
+    tkhd = _find(view, trak, b"tkhd")
+    if tkhd is None:
+        return None
+    version, _ = _full_box(view, tkhd)
+    (track_id,) = struct.unpack_from(">I", view, tkhd.body + (20 if version == 1 else 12))
+
+    stsd = trak
+    for box_type in (b"mdia", b"minf", b"stbl", b"stsd"):
+        stsd = _find(view, stsd, box_type)
+        if stsd is None:
+            return None
+
+    found = TrackEncryption(track_id, "", "", 0, is_protected=False)
+    # stsd is a full box followed by a 32-bit entry count.
+    for entry in _iter_boxes(view, stsd.body + 8, stsd.end):
+        skip = _SAMPLE_ENTRY_FIELDS.get(entry.type)
+        if skip is None:
+            continue
+        if entry.type == b"enca" and struct.unpack_from(">H", view, entry.body + 8)[0] != 0:
+            raise UnsupportedEncryption("QuickTime-style audio sample entries are not supported")
+
+        children = _Box(entry.type, entry.start, entry.body + skip, entry.end)
+        sinf = _find(view, children, b"sinf")
+        if sinf is None:
+            continue
+        frma = _find(view, sinf, b"frma")
+        schm = _find(view, sinf, b"schm")
+        schi = _find(view, sinf, b"schi")
+        tenc = _find(view, schi, b"tenc") if schi is not None else None
+        if frma is None or schm is None or tenc is None:
+            raise UnsupportedEncryption("Protected sample entry without frma/schm/tenc")
+
+        scheme = bytes(view[schm.body + 4:schm.body + 8]).decode("ascii", errors="replace")
+        # tenc: version/flags(4), reserved(1), pattern(1), is_protected(1), iv_size(1),
+        # kid(16), then a constant IV when protected without per-sample IVs.
+        is_protected = view[tenc.body + 6] != 0
+        iv_size = view[tenc.body + 7]
+        kid = bytes(view[tenc.body + 8:tenc.body + 24]).hex()
+        constant_iv = b""
+        if is_protected and iv_size == 0 and tenc.body + 25 <= tenc.end:
+            constant_iv_size = view[tenc.body + 24]
+            constant_iv = bytes(view[tenc.body + 25:tenc.body + 25 + constant_iv_size])
+        found = TrackEncryption(track_id, scheme, kid, iv_size, is_protected, constant_iv)
+
+        out[entry.start + 4:entry.start + 8] = view[frma.body:frma.body + 4]
+        out[sinf.start + 4:sinf.start + 8] = b"free"
+    return found
+
+
+def decrypt_media_segment(
+    data: bytes, tracks: Mapping[int, Tuple[TrackEncryption, Optional[bytes]]]
+) -> bytearray:
+    """
+    Decrypt every sample of a ``cenc`` (AES-128 CTR) media segment.
+
+    Per-sample IVs and subsample ranges come from each fragment's ``senc``
+    box; sample positions come from ``tfhd``/``trun``, and each fragment's
+    track is matched by the ``tfhd`` track_ID. ``senc`` is renamed
+    to ``free`` afterwards so the output reads as clear content. Samples are
+    decrypted in place in a single copy of the payload.
+
+    Args:
+        data: Media segment (one or more moof/mdat pairs)
+        tracks: Protection info recorded from the init segment and the
+            16-byte content key (None for clear tracks), by track_ID
+
+    Returns:
+        Decrypted segment (a bytes-like object)
+
+    Raises:
+        UnsupportedEncryption: For schemes other than cenc or layouts this
+            parser does not handle; callers should fall back to mp4decrypt
+    """
+    out = bytearray(data)
+    with memoryview(out) as view:
+        for moof in _iter_boxes(view, 0, len(view)):
+            if moof.type != b"moof":
+                continue
+            # Without an explicit base, a track fragment's data follows the
+            # previous fragment's data; the first one starts at the moof.
+            data_end: Optional[int] = moof.start
+            for traf in _iter_boxes(view, moof.body, moof.end):
+                if traf.type == b"traf":
+                    data_end = _decrypt_fragment(view, moof, traf, tracks, data_end)
+    return out
+
+
+def _decrypt_fragment(
+    view: memoryview,
+    moof: _Box,
+    traf: _Box,
+    tracks: Mapping[int, Tuple[TrackEncryption, Optional[bytes]]],
+    data_end: Optional[int],
+) -> Optional[int]:
+    """Decrypt one track fragment; return where its sample data ends, if known."""
+    tfhd: Optional[_Box] = None
+    truns: List[_Box] = []
+    senc: Optional[_Box] = None
+    for box in _iter_boxes(view, traf.body, traf.end):
+        if box.type == b"tfhd":
+            tfhd = box
+        elif box.type == b"trun":
+            truns.append(box)
+        elif box.type == b"senc":
+            senc = box
+        elif box.type in (b"saiz", b"saio"):
+            continue
+        elif box.type == b"sgpd" and bytes(view[box.body + 4:box.body + 8]) == b"seig":
+            raise UnsupportedEncryption("Sample-group key rotation (seig) is not supported")
+    if tfhd is None:
+        raise UnsupportedEncryption("Track fragment without tfhd")
+
+    (track_id,) = struct.unpack_from(">I", view, tfhd.body + 4)
+    if track_id not in tracks:
+        raise UnsupportedEncryption(f"No init segment seen for track {track_id}")
+    track, key = tracks[track_id]
+    base, default_size = _parse_tfhd(view, tfhd, moof, data_end)
+    default_size = default_size or track.default_sample_size
+    if not track.is_protected:
+        # Clear samples stay as they are; their extent only matters as the
+        # implicit base of the next track fragment.
+        if base is None:
+            return None
+        try:
+            return _data_end(_sample_ranges(view, truns, base, default_size), base)
+        except UnsupportedEncryption:
+            return None
+    if track.scheme != "cenc":
+        raise UnsupportedEncryption(f"Scheme {track.scheme!r} is not supported natively")
+    if senc is None:
+        # The init promised encrypted samples, so this is sample encryption
+        # stored elsewhere (e.g. a PIFF uuid box or saiz/saio only).
+        raise UnsupportedEncryption("Protected fragment without a senc box")
+    if key is None or len(key) != 16:
+        raise UnsupportedEncryption("cenc requires a 16-byte key")
+
+    if base is None:
+        raise UnsupportedEncryption("Track fragment data follows a fragment of unknown size")
+    samples = _sample_ranges(view, truns, base, default_size)
+
+    _, senc_flags = _full_box(view, senc)
+    (sample_count,) = struct.unpack_from(">I", view, senc.body + 4)
+    if sample_count != len(samples):
+        raise UnsupportedEncryption("senc sample count does not match trun")
+
+    iv_size = track.iv_size
+    if iv_size not in (8, 16) and not (iv_size == 0 and len(track.constant_iv) in (8, 16)):
+        raise UnsupportedEncryption(f"Unsupported per-sample IV size {iv_size}")
+
+    pos = senc.body + 8
+    for offset, size in samples:
+        iv = bytes(view[pos:pos + iv_size]) if iv_size else track.constant_iv
+        iv = iv.ljust(16, b"\0")
+        pos += iv_size
+        cipher = AES.new(key, AES.MODE_CTR, initial_value=iv, nonce=b"")
+
+        if senc_flags & _SENC_USE_SUBSAMPLES:
+            (subsample_count,) = struct.unpack_from(">H", view, pos)
+            pos += 2
+            ranges = []
+            cursor = offset
+            for _ in range(subsample_count):
+                clear, encrypted = struct.unpack_from(">HI", view, pos)
+                pos += 6
+                cursor += clear
+                ranges.append(view[cursor:cursor + encrypted])
+                cursor += encrypted
+            if cursor > offset + size:
+                raise UnsupportedEncryption("Subsamples exceed the sample size")
+            # The encrypted parts of a sample form one continuous CTR stream,
+            # which the cipher carries over from one call to the next.
+            for encrypted_range in ranges:
+                cipher.decrypt(encrypted_range, output=encrypted_range)
+        else:
+            sample = view[offset:offset + size]
+            cipher.decrypt(sample, output=sample)
+
+    if pos > senc.end:
+        raise UnsupportedEncryption("senc box is truncated")
+    view[senc.start + 4:senc.start + 8] = b"free"
+    return _data_end(samples, base)
+
+
+def _data_end(samples: List[Tuple[int, int]], base: int) -> int:
+    if not samples:
+        return base
+    offset, size = samples[-1]
+    return offset + size
+
+
+def _parse_tfhd(
+    view: memoryview, tfhd: _Box, moof: _Box, data_end: Optional[int]
+) -> Tuple[Optional[int], int]:
+    _, flags = _full_box(view, tfhd)
+    pos = tfhd.body + 8  # version/flags and track_ID
+    base = moof.start if flags & _TFHD_DEFAULT_BASE_IS_MOOF else data_end
+    if flags & _TFHD_BASE_DATA_OFFSET:
+        (base,) = struct.unpack_from(">Q", view, pos)
+        pos += 8
+    if flags & _TFHD_SAMPLE_DESCRIPTION_INDEX:
+        pos += 4
+    if flags & _TFHD_DEFAULT_SAMPLE_DURATION:
+        pos += 4
+    default_size = 0
+    if flags & _TFHD_DEFAULT_SAMPLE_SIZE:
+        (default_size,) = struct.unpack_from(">I", view, pos)
+    return base, default_size
+
+
+def _sample_ranges(
+    view: memoryview, truns: List[_Box], base: int, default_size: int
+) -> List[Tuple[int, int]]:
+    samples: List[Tuple[int, int]] = []
+    cursor = base
+    for trun in truns:
+        _, flags = _full_box(view, trun)
+        (count,) = struct.unpack_from(">I", view, trun.body + 4)
+        pos = trun.body + 8
+        if flags & _TRUN_DATA_OFFSET:
+            (data_offset,) = struct.unpack_from(">i", view, pos)
+            cursor = base + data_offset
+            pos += 4
+        if flags & _TRUN_FIRST_SAMPLE_FLAGS:
+            pos += 4
+        for _ in range(count):
+            if flags & _TRUN_SAMPLE_DURATION:
+                pos += 4
+            size = default_size
+            if flags & _TRUN_SAMPLE_SIZE:
+                (size,) = struct.unpack_from(">I", view, pos)
+                pos += 4
+            if flags & _TRUN_SAMPLE_FLAGS:
+                pos += 4
+            if flags & _TRUN_SAMPLE_CTS_OFFSET:
+                pos += 4
+            if not size:
+                raise UnsupportedEncryption("Sample size is unknown")
+            if cursor + size > len(view):
+                raise UnsupportedEncryption("Sample data lies outside the segment")
+            samples.append((cursor, size))
+            cursor += size
+    return samples
@@ -35,7 +35,8 @@ def cli():
 @click.option("--label", help="Human-friendly label for the stream")
 @click.option("--poll-interval", type=float, help="Seconds between MPD refreshes (live)")
 @click.option("--window-size", type=int, help="Number of segments to keep in live playlist")
-@click.option("--history-size", type=int, help="Segment history size for deduplication")
+@click.option("--history-size", type=int, hidden=True, help="Deprecated; has no effect")
+@click.option("--max-parallel", type=int, help="Maximum concurrent segment downloads")
 @click.option("--mp4decrypt-path", help="Path to the mp4decrypt executable")
 @click.option("--header", multiple=True, help="Additional HTTP header as Name:Value")
 @click.option("--output-dir", help="Custom output directory for this stream")
@@ -49,6 +50,7 @@ def add_stream(
     poll_interval,
     window_size,
     history_size,
+    max_parallel,
     mp4decrypt_path,
     header,
     output_dir,
@@ -86,7 +88,9 @@ def add_stream(
     if window_size is not None:
         payload["window_size"] = window_size
     if history_size is not None:
-        payload["history_size"] = history_size
+        click.echo("Warning: --history-size is deprecated and ignored", err=True)
+    if max_parallel is not None:
+        payload["max_parallel"] = max_parallel
     if mp4decrypt_path:
         payload["mp4decrypt_path"] = mp4decrypt_path
     if output_dir:
@@ -4,8 +4,9 @@ from __future__ import annotations
 
 import math
 import re
-from dataclasses import dataclass
-from typing import List, Optional
+from io import BytesIO
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union
 from urllib.parse import urljoin, urlparse
 from lxml import etree
 
@@ -45,6 +46,10 @@ class DashManifest:
     representations: List[DashRepresentation]
     is_live: bool
     min_update_period: Optional[float]
+    # Subsets of ``representations``, split once at parse time.
+    video_representations: List[DashRepresentation] = field(default_factory=list)
+    audio_representations: List[DashRepresentation] = field(default_factory=list)
+    representations_by_id: Dict[str, DashRepresentation] = field(default_factory=dict)
 
 
 @dataclass
@@ -72,11 +77,73 @@ class DashParser:
     MAX_TIMELINE_REPEAT = 30
 
     @staticmethod
-    def parse(mpd_content: str, mpd_url: str) -> DashManifest:
-        """Parse MPD manifest content."""
-        root = etree.fromstring(mpd_content.encode("utf-8"))
+    def parse(mpd_content: Union[str, bytes], mpd_url: str) -> DashManifest:
+        """Parse MPD manifest content, given as text or as the raw response body."""
+        if isinstance(mpd_content, str):
+            mpd_content = mpd_content.encode("utf-8")
+
+        # Walk the document one Period at a time and free each one once its
+        # representations are extracted, so multi-period manifests never hold
+        # their whole DOM. Only Period end events cross into Python.
+        events = etree.iterparse(
+            BytesIO(mpd_content),
+            events=("end",),
+            tag=f"{{{DashParser.DASH_NS['mpd']}}}Period",
+            remove_comments=True,
+            resolve_entities=False,
+        )
 
         mpd_dir = DashParser._base_dir(mpd_url)
+        root: Optional[etree._Element] = None
+        manifest_base = mpd_dir
+        is_live = False
+        media_duration: Optional[float] = None
+        representations: List[DashRepresentation] = []
+
+        for _, period in events:
+            if root is None:
+                # MPD-level children (BaseURL, ...) precede the first Period.
+                root = period.getroottree().getroot()
+                manifest_base, is_live, media_duration = DashParser._manifest_attributes(
+                    root, mpd_dir
+                )
+            if period.getparent() is not root:
+                continue
+            representations.extend(
+                DashParser._parse_period(root, period, manifest_base, media_duration, is_live)
+            )
+            period.clear()
+            root.remove(period)
+
+        if root is None:
+            root = events.root
+            manifest_base, is_live, media_duration = DashParser._manifest_attributes(root, mpd_dir)
+
+        min_update_str = root.get("minimumUpdatePeriod")
+        min_update = (
+            DashParser._parse_duration(min_update_str) if min_update_str else None
+        )
+
+        # First occurrence wins when an id repeats across Periods.
+        by_id: Dict[str, DashRepresentation] = {}
+        for rep in representations:
+            by_id.setdefault(rep.id, rep)
+
+        return DashManifest(
+            base_url=manifest_base,
+            media_presentation_duration=media_duration,
+            representations=representations,
+            is_live=is_live,
+            min_update_period=min_update,
+            video_representations=[rep for rep in representations if rep.is_video],
+            audio_representations=[rep for rep in representations if rep.is_audio],
+            representations_by_id=by_id,
+        )
+
+    @staticmethod
+    def _manifest_attributes(
+        root: etree._Element, mpd_dir: str
+    ) -> tuple[str, bool, Optional[float]]:
         manifest_base = DashParser._apply_base_url(mpd_dir, root)
 
         mpd_type = (root.get("type", "static") or "static").lower()
@@ -86,123 +153,120 @@ class DashParser:
         media_duration = (
             DashParser._parse_duration(duration_str) if duration_str else None
         )
+        return manifest_base, is_live, media_duration
 
-        min_update_str = root.get("minimumUpdatePeriod")
-        min_update = (
-            DashParser._parse_duration(min_update_str) if min_update_str else None
+    @staticmethod
+    def _parse_period(
+        root: etree._Element,
+        period: etree._Element,
+        manifest_base: str,
+        media_duration: Optional[float],
+        is_live: bool,
+    ) -> List[DashRepresentation]:
+        representations: List[DashRepresentation] = []
+
+        period_duration = (
+            DashParser._parse_duration(period.get("duration"))
+            if period.get("duration")
+            else None
         )
+        period_base = DashParser._apply_base_url(manifest_base, period)
 
-        representations: List[DashRepresentation] = []
+        for adaptation_set in period.findall(
+            "./mpd:AdaptationSet", namespaces=DashParser.DASH_NS
+        ):
+            if DashParser._skip_adaptation_set(adaptation_set):
+                continue
 
-        for period in root.findall("./mpd:Period", namespaces=DashParser.DASH_NS):
-            period_duration = (
-                DashParser._parse_duration(period.get("duration"))
-                if period.get("duration")
-                else None
-            )
-            period_base = DashParser._apply_base_url(manifest_base, period)
+            adaptation_base = DashParser._apply_base_url(period_base, adaptation_set)
 
-            for adaptation_set in period.findall(
-                "./mpd:AdaptationSet", namespaces=DashParser.DASH_NS
+            for representation in adaptation_set.findall(
+                "./mpd:Representation", namespaces=DashParser.DASH_NS
             ):
-                if DashParser._skip_adaptation_set(adaptation_set):
+                rep_id = representation.get("id") or ""
+                if not rep_id:
                     continue
 
-                adaptation_base = DashParser._apply_base_url(period_base, adaptation_set)
+                rep_mime = representation.get("mimeType") or adaptation_set.get(
+                    "mimeType", ""
+                )
+                rep_codecs = representation.get("codecs") or adaptation_set.get(
+                    "codecs", ""
+                )
+                width = DashParser._maybe_int(representation.get("width"))
+                height = DashParser._maybe_int(representation.get("height"))
+                bandwidth = DashParser._safe_int(
+                    representation.get("bandwidth"), default=0
+                )
 
-                for representation in adaptation_set.findall(
-                    "./mpd:Representation", namespaces=DashParser.DASH_NS
-                ):
-                    rep_id = representation.get("id") or ""
-                    if not rep_id:
-                        continue
+                is_video, is_audio = DashParser._classify_track(
+                    adaptation_set, representation
+                )
+                if not is_video and not is_audio:
+                    continue
 
-                    rep_mime = representation.get("mimeType") or adaptation_set.get(
-                        "mimeType", ""
-                    )
-                    rep_codecs = representation.get("codecs") or adaptation_set.get(
-                        "codecs", ""
-                    )
-                    width = DashParser._maybe_int(representation.get("width"))
-                    height = DashParser._maybe_int(representation.get("height"))
-                    bandwidth = DashParser._safe_int(
-                        representation.get("bandwidth"), default=0
-                    )
+                default_kid = DashParser._resolve_default_kid(
+                    adaptation_set, representation
+                )
 
-                    is_video, is_audio = DashParser._classify_track(
-                        adaptation_set, representation
-                    )
-                    if not is_video and not is_audio:
-                        continue
+                rep_base = DashParser._apply_base_url(adaptation_base, representation)
 
-                    default_kid = DashParser._resolve_default_kid(
-                        adaptation_set, representation
-                    )
+                template = DashParser._resolve_segment_template(
+                    [root, period, adaptation_set, representation]
+                )
+                segment_list = DashParser._find_first_in_hierarchy(
+                    [representation, adaptation_set, period, root], "SegmentList"
+                )
+                segment_base = DashParser._find_first_in_hierarchy(
+                    [representation, adaptation_set, period, root], "SegmentBase"
+                )
+
+                init_url: str = ""
+                segments: List[DashSegment] = []
 
-                    rep_base = DashParser._apply_base_url(adaptation_base, representation)
+                total_duration = period_duration or media_duration
 
-                    template = DashParser._resolve_segment_template(
-                        [root, period, adaptation_set, representation]
+                if template and template.media:
+                    init_url, segments = DashParser._parse_segment_template(
+                        template,
+                        rep_id=rep_id,
+                        base_url=rep_base,
+                        bandwidth=bandwidth,
+                        total_duration=total_duration,
+                        is_live=is_live,
                     )
-                    segment_list = DashParser._find_first_in_hierarchy(
-                        [representation, adaptation_set, period, root], "SegmentList"
+                elif segment_list is not None:
+                    init_url, segments = DashParser._parse_segment_list(
+                        segment_list, rep_base
                     )
-                    segment_base = DashParser._find_first_in_hierarchy(
-                        [representation, adaptation_set, period, root], "SegmentBase"
+                elif segment_base is not None:
+                    init_url, segments = DashParser._parse_segment_base(
+                        segment_base, rep_base, total_duration
                     )
+                else:
+                    # Representation without known segment addressing
+                    continue
+
+                if not init_url or not segments:
+                    continue
 
-                    init_url: str = ""
-                    segments: List[DashSegment] = []
-
-                    total_duration = period_duration or media_duration
-
-                    if template and template.media:
-                        init_url, segments = DashParser._parse_segment_template(
-                            template,
-                            rep_id=rep_id,
-                            base_url=rep_base,
-                            bandwidth=bandwidth,
-                            total_duration=total_duration,
-                            is_live=is_live,
-                        )
-                    elif segment_list is not None:
-                        init_url, segments = DashParser._parse_segment_list(
-                            segment_list, rep_base
-                        )
-                    elif segment_base is not None:
-                        init_url, segments = DashParser._parse_segment_base(
-                            segment_base, rep_base, total_duration
-                        )
-                    else:
-                        # Representation without known segment addressing
-                        continue
-
-                    if not init_url or not segments:
-                        continue
-
-                    representations.append(
-                        DashRepresentation(
-                            id=rep_id,
-                            bandwidth=bandwidth,
-                            codecs=rep_codecs,
-                            mime_type=rep_mime,
-                            width=width,
-                            height=height,
-                            init_url=init_url,
-                            segments=segments,
-                            is_video=is_video,
-                            is_audio=is_audio,
-                            default_kid=default_kid,
-                        )
+                representations.append(
+                    DashRepresentation(
+                        id=rep_id,
+                        bandwidth=bandwidth,
+                        codecs=rep_codecs,
+                        mime_type=rep_mime,
+                        width=width,
+                        height=height,
+                        init_url=init_url,
+                        segments=segments,
+                        is_video=is_video,
+                        is_audio=is_audio,
+                        default_kid=default_kid,
                     )
+                )
 
-        return DashManifest(
-            base_url=manifest_base,
-            media_presentation_duration=media_duration,
-            representations=representations,
-            is_live=is_live,
-            min_update_period=min_update,
-        )
+        return representations
 
     # ------------------------------------------------------------------
     # Helper utilities
@@ -3,12 +3,15 @@
 from __future__ import annotations
 
 import asyncio
-import os
+import itertools
 import shutil
 import tempfile
+import weakref
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Optional, Protocol
+from typing import Dict, List, Optional, Protocol, Sequence
+
+from . import cenc
 
 
 class DecryptionError(RuntimeError):
@@ -18,28 +21,62 @@ class DecryptionError(RuntimeError):
 class Decryptor(Protocol):
     """Interface for decrypting DASH segments."""
 
-    async def decrypt_segment(self, data: bytes, *, kid: Optional[str] = None) -> bytes:
-        """Decrypt a segment payload."""
+    async def decrypt_segment(
+        self, data: bytes, *, kid: Optional[str] = None, track: Optional[str] = None
+    ) -> bytes:
+        """Decrypt a segment payload of ``track`` (e.g. "video" or "audio")."""
+
+    async def decrypt_segments(
+        self,
+        payloads: Sequence[bytes],
+        *,
+        kid: Optional[str] = None,
+        track: Optional[str] = None,
+    ) -> List[bytes]:
+        """Decrypt several segment payloads of one track, preserving order."""
 
 
 @dataclass
 class PlaintextDecryptor:
     """Pass-through decryptor for unencrypted content."""
 
-    async def decrypt_segment(self, data: bytes, *, kid: Optional[str] = None) -> bytes:
+    async def decrypt_segment(
+        self, data: bytes, *, kid: Optional[str] = None, track: Optional[str] = None
+    ) -> bytes:
         return data
 
+    async def decrypt_segments(
+        self,
+        payloads: Sequence[bytes],
+        *,
+        kid: Optional[str] = None,
+        track: Optional[str] = None,
+    ) -> List[bytes]:
+        return list(payloads)
+
 
 class Mp4DecryptBinary(Decryptor):
     """Decrypt segments by invoking the external `mp4decrypt` binary."""
 
-    def __init__(self, key_map: Dict[str, str], executable: str = "mp4decrypt") -> None:
+    def __init__(
+        self,
+        key_map: Dict[str, str],
+        executable: str = "mp4decrypt",
+        *,
+        max_workers: int = 4,
+    ) -> None:
         if not key_map:
             raise ValueError("key_map must contain at least one entry")
 
         normalized = {self._normalize_kid(k): self._normalize_key(v) for k, v in key_map.items()}
         self.key_map = normalized
         self.executable = executable
+        # Bounds the number of mp4decrypt processes alive at once.
+        self._workers = asyncio.Semaphore(max(1, max_workers))
+        # One scratch directory for the decryptor's lifetime; batches are
+        # told apart by a counter so concurrent tracks never collide.
+        self._scratch_dir: Optional[Path] = None
+        self._batch_ids = itertools.count()
 
         if shutil.which(self.executable) is None:
             raise FileNotFoundError(
@@ -59,10 +96,7 @@ class Mp4DecryptBinary(Decryptor):
             raise ValueError("Keys must be 16 or 32 bytes expressed in hexadecimal characters")
         return key
 
-    async def decrypt_segment(self, data: bytes, *, kid: Optional[str] = None) -> bytes:
-        if not data:
-            raise DecryptionError("Cannot decrypt empty data")
-
+    def _resolve_key(self, kid: Optional[str]) -> tuple[str, str]:
         if kid:
             kid = self._normalize_kid(kid)
             if kid not in self.key_map:
@@ -74,28 +108,63 @@ class Mp4DecryptBinary(Decryptor):
         else:
             kid = next(iter(self.key_map))
 
-        key = self.key_map[kid]
+        return kid, self.key_map[kid]
+
+    async def decrypt_segment(
+        self, data: bytes, *, kid: Optional[str] = None, track: Optional[str] = None
+    ) -> bytes:
+        decrypted = await self.decrypt_segments([data], kid=kid, track=track)
+        return decrypted[0]
+
+    async def decrypt_segments(
+        self,
+        payloads: Sequence[bytes],
+        *,
+        kid: Optional[str] = None,
+        track: Optional[str] = None,
+    ) -> List[bytes]:
+        if not payloads:
+            return []
+        if any(not data for data in payloads):
+            raise DecryptionError("Cannot decrypt empty data")
+
+        kid, key = self._resolve_key(kid)
 
         # Use temporary files instead of stdin/stdout pipes for better compatibility
-        # with different versions of mp4decrypt
-        temp_dir = None
+        # with different versions of mp4decrypt.
+        batch = next(self._batch_ids)
+        scratch = self._scratch()
+        inputs = [scratch / f"encrypted_{batch}_{index}.mp4" for index in range(len(payloads))]
+        outputs = [scratch / f"decrypted_{batch}_{index}.mp4" for index in range(len(payloads))]
         try:
-            # Create temporary directory
-            temp_dir = tempfile.mkdtemp(prefix="dash2hls_decrypt_")
-            input_path = Path(temp_dir) / "encrypted.mp4"
-            output_path = Path(temp_dir) / "decrypted.mp4"
-
-            # Write encrypted data to temp file
-            input_path.write_bytes(data)
-
-            command = [
-                self.executable,
-                "--key",
-                f"{kid}:{key}",
-                str(input_path),
-                str(output_path),
-            ]
-
+            await asyncio.to_thread(_write_files, inputs, payloads)
+            results = await asyncio.gather(
+                *(self._run(kid, key, src, dst) for src, dst in zip(inputs, outputs)),
+                return_exceptions=True,
+            )
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+            return list(results)
+        finally:
+            await asyncio.to_thread(_remove_files, inputs + outputs)
+
+    def _scratch(self) -> Path:
+        if self._scratch_dir is None or not self._scratch_dir.is_dir():
+            self._scratch_dir = Path(tempfile.mkdtemp(prefix="dash2hls_decrypt_"))
+            weakref.finalize(self, shutil.rmtree, self._scratch_dir, True)
+        return self._scratch_dir
+
+    async def _run(self, kid: str, key: str, input_path: Path, output_path: Path) -> bytes:
+        command = [
+            self.executable,
+            "--key",
+            f"{kid}:{key}",
+            str(input_path),
+            str(output_path),
+        ]
+
+        async with self._workers:
             process = await asyncio.create_subprocess_exec(
                 *command,
                 stdout=asyncio.subprocess.PIPE,
@@ -103,28 +172,109 @@ class Mp4DecryptBinary(Decryptor):
             )
             stdout, stderr = await process.communicate()
 
-            if process.returncode != 0:
-                raise DecryptionError(
-                    f"mp4decrypt failed (exit code {process.returncode}).\n"
-                    f"STDOUT: {stdout.decode(errors='ignore')}\n"
-                    f"STDERR: {stderr.decode(errors='ignore')}"
-                )
+        if process.returncode != 0:
+            raise DecryptionError(
+                f"mp4decrypt failed (exit code {process.returncode}).\n"
+                f"STDOUT: {stdout.decode(errors='ignore')}\n"
+                f"STDERR: {stderr.decode(errors='ignore')}"
+            )
 
-            if not output_path.exists():
-                raise DecryptionError(f"mp4decrypt did not create output file: {output_path}")
+        # Read decrypted data
+        try:
+            decrypted_data = await asyncio.to_thread(output_path.read_bytes)
+        except FileNotFoundError:
+            raise DecryptionError(f"mp4decrypt did not create output file: {output_path}") from None
 
-            # Read decrypted data
-            decrypted_data = output_path.read_bytes()
+        if not decrypted_data:
+            raise DecryptionError("mp4decrypt produced empty output")
 
-            if not decrypted_data:
-                raise DecryptionError("mp4decrypt produced empty output")
+        return decrypted_data
 
-            return decrypted_data
 
-        finally:
-            # Clean up temporary files
-            if temp_dir and os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir, ignore_errors=True)
+class CencDecryptor(Decryptor):
+    """Decrypt ``cenc`` (AES-128 CTR) segments in-process.
+
+    Track parameters are learned from the init segments passing through
+    ``decrypt_segment`` and kept per ``track`` name and track_ID, so tracks
+    sharing a KID never overwrite each other. Content the native path cannot
+    handle (cbcs, key rotation, ...) is handed to an optional mp4decrypt
+    fallback.
+    """
+
+    def __init__(self, key_map: Dict[str, str], *, fallback: Optional[Decryptor] = None) -> None:
+        if not key_map:
+            raise ValueError("key_map must contain at least one entry")
+
+        self.key_map = {
+            Mp4DecryptBinary._normalize_kid(k): Mp4DecryptBinary._normalize_key(v)
+            for k, v in key_map.items()
+        }
+        self.fallback = fallback
+        self._tracks: Dict[
+            Optional[str], Dict[int, tuple[cenc.TrackEncryption, Optional[bytes]]]
+        ] = {}
+
+    def _key(self, info: cenc.TrackEncryption) -> Optional[bytes]:
+        if not info.is_protected:
+            return None
+        key = self.key_map.get(info.kid)
+        if key is None:
+            if len(self.key_map) != 1:
+                raise DecryptionError(f"No key registered for KID {info.kid}")
+            key = next(iter(self.key_map.values()))
+        return bytes.fromhex(key)
+
+    def _decrypt(self, data: bytes, track: Optional[str]) -> bytes:
+        if cenc.is_init_segment(data):
+            clear, found = cenc.clear_init_segment(data)
+            self._tracks[track] = {info.track_id: (info, self._key(info)) for info in found}
+            return clear
+
+        tracks = self._tracks.get(track)
+        if tracks is None:
+            raise cenc.UnsupportedEncryption("No init segment seen for this track")
+        return cenc.decrypt_media_segment(data, tracks)
+
+    async def decrypt_segment(
+        self, data: bytes, *, kid: Optional[str] = None, track: Optional[str] = None
+    ) -> bytes:
+        decrypted = await self.decrypt_segments([data], kid=kid, track=track)
+        return decrypted[0]
+
+    async def decrypt_segments(
+        self,
+        payloads: Sequence[bytes],
+        *,
+        kid: Optional[str] = None,
+        track: Optional[str] = None,
+    ) -> List[bytes]:
+        if not payloads:
+            return []
+        if any(not data for data in payloads):
+            raise DecryptionError("Cannot decrypt empty data")
+
+        try:
+            # pycryptodome releases the GIL while decrypting, so the batch
+            # runs on a worker thread without stalling the event loop.
+            return await asyncio.to_thread(
+                lambda: [self._decrypt(data, track) for data in payloads]
+            )
+        except cenc.UnsupportedEncryption as exc:
+            if self.fallback is None:
+                raise DecryptionError(
+                    f"{exc}; install mp4decrypt (Bento4) to decrypt this content"
+                ) from None
+            return await self.fallback.decrypt_segments(payloads, kid=kid, track=track)
+
+
+def _write_files(paths: Sequence[Path], payloads: Sequence[bytes]) -> None:
+    for path, data in zip(paths, payloads):
+        path.write_bytes(data)
+
+
+def _remove_files(paths: Sequence[Path]) -> None:
+    for path in paths:
+        path.unlink(missing_ok=True)
 
 
 def build_decryptor(
@@ -139,8 +289,6 @@ def build_decryptor(
     if disable or (not key and not key_map):
         return PlaintextDecryptor()
 
-    mp4decrypt_path = mp4decrypt_path or "mp4decrypt"
-
     if key_map is None:
         if not key:
             raise ValueError("Either key or key_map must be supplied")
@@ -148,4 +296,13 @@ def build_decryptor(
             raise ValueError("A key_id (KID) must be provided alongside the key")
         key_map = {kid: key}
 
-    return Mp4DecryptBinary(key_map=key_map, executable=mp4decrypt_path)
+    # cenc content is decrypted natively; mp4decrypt only covers the rest, so
+    # it is optional unless a path was given explicitly.
+    try:
+        fallback = Mp4DecryptBinary(key_map=key_map, executable=mp4decrypt_path or "mp4decrypt")
+    except FileNotFoundError:
+        if mp4decrypt_path:
+            raise
+        fallback = None
+
+    return CencDecryptor(key_map, fallback=fallback)
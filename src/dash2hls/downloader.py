@@ -1,21 +1,123 @@
 """Async downloader for DASH segments."""
 
+import functools
+import logging
+import socket
+from dataclasses import dataclass
+
 import aiohttp
+from aiohttp import http_parser
 from typing import Optional
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
+# Stalled connections are caught by sock_read on every request. Only the
+# small MPD fetches also get a total budget: a large segment from a slow
+# origin may legitimately take longer than any fixed limit.
+_SESSION_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=5, sock_read=10)
+MANIFEST_TIMEOUT = aiohttp.ClientTimeout(total=15, sock_connect=5, sock_read=10)
+
+
+@dataclass
+class TextResponse:
+    """Result of a conditional text download."""
+
+    status: int
+    body: Optional[bytes]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    encoding: str = "utf-8"
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+    @property
+    def text(self) -> Optional[str]:
+        return None if self.body is None else self.body.decode(self.encoding, errors="replace")
+
+
+def _keepalive_socket(addr_info: tuple) -> socket.socket:
+    family, type_, proto, _, _ = addr_info
+    sock = socket.socket(family=family, type=type_, proto=proto)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    if hasattr(socket, "TCP_KEEPIDLE"):  # Linux; other platforms keep their defaults
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30)
+    return sock
+
+
+def create_http_session() -> aiohttp.ClientSession:
+    """
+    Create the HTTP client shared by every stream of a manager.
+
+    One pooled connector lets streams hitting the same CDN reuse connections,
+    DNS lookups and TLS sessions. Pooled connections are kept for 75 s with TCP
+    keepalive so MPD polls do not pay a new handshake every time. Reads that
+    stall time out, and MPD requests are also bounded in total, so a stalled
+    fetch cannot hang a stream's poll loop. Must be called with an event loop
+    running.
+
+    Returns:
+        A new aiohttp ClientSession; the caller is responsible for closing it
+    """
+    connector_options = dict(
+        # Per-stream max_parallel already bounds concurrency; no global cap.
+        limit=0,
+        limit_per_host=16,
+        ttl_dns_cache=300,
+        use_dns_cache=True,
+        keepalive_timeout=75,
+        enable_cleanup_closed=True,
+    )
+    try:
+        connector = aiohttp.TCPConnector(socket_factory=_keepalive_socket, **connector_options)
+    except TypeError:  # aiohttp < 3.12 has no socket_factory
+        connector = aiohttp.TCPConnector(**connector_options)
+    # Streams share this session, so a shared cookie jar would leak one
+    # stream's auth or CDN token cookies into another's requests.
+    return aiohttp.ClientSession(
+        connector=connector, timeout=_SESSION_TIMEOUT, cookie_jar=aiohttp.DummyCookieJar()
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def check_http_parser() -> bool:
+    """
+    Check that aiohttp parses responses with its C (llhttp) extension.
+
+    Logs a warning once when the pure-Python fallback is active, e.g. because
+    AIOHTTP_NO_EXTENSIONS is set or no binary wheel exists for the platform.
+
+    Returns:
+        True if the C parser is in use
+    """
+    accelerated = http_parser.HttpResponseParser.__module__ == "aiohttp._http_parser"
+    if not accelerated:
+        logger.warning(
+            "aiohttp is using its pure-Python HTTP parser; segment downloads will be "
+            "CPU-bound. Unset AIOHTTP_NO_EXTENSIONS or install an aiohttp binary wheel."
+        )
+    return accelerated
+
 
 class SegmentDownloader:
     """Asynchronous segment downloader."""
 
-    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+    def __init__(
+        self,
+        session: Optional[aiohttp.ClientSession] = None,
+        headers: Optional[dict] = None,
+    ):
         """
         Initialize downloader.
         
         Args:
             session: Optional aiohttp session. If None, a new one will be created.
+            headers: Optional HTTP headers sent with every request
         """
         self.session = session
+        self.headers = headers or {}
         self._own_session = session is None
 
     async def __aenter__(self):
@@ -41,7 +143,7 @@ class SegmentDownloader:
         if self.session is None:
             raise RuntimeError("Session not initialized. Use 'async with' context manager.")
 
-        async with self.session.get(url, headers=headers) as response:
+        async with self.session.get(url, headers=self._merge_headers(headers)) as response:
             response.raise_for_status()
             return await response.read()
 
@@ -72,6 +174,89 @@ class SegmentDownloader:
         if self.session is None:
             raise RuntimeError("Session not initialized. Use 'async with' context manager.")
 
-        async with self.session.get(url, headers=headers) as response:
+        async with self.session.get(
+            url, headers=self._merge_headers(headers), timeout=MANIFEST_TIMEOUT
+        ) as response:
             response.raise_for_status()
             return await response.text()
+
+    async def download_text_conditional(
+        self,
+        url: str,
+        *,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        headers: Optional[dict] = None,
+    ) -> TextResponse:
+        """
+        Download a URL as text, revalidating against previous validators.
+
+        Args:
+            url: URL to download
+            etag: ETag from the previous response, sent as If-None-Match
+            last_modified: Last-Modified from the previous response, sent as If-Modified-Since
+            headers: Optional HTTP headers
+
+        Returns:
+            TextResponse; ``body`` is None when the server answered 304 Not Modified.
+            The body is kept as raw bytes and only decoded when ``text`` is read.
+        """
+        return await self.download_conditional(
+            url, etag=etag, last_modified=last_modified, headers=headers, timeout=MANIFEST_TIMEOUT
+        )
+
+    async def download_conditional(
+        self,
+        url: str,
+        *,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        headers: Optional[dict] = None,
+        timeout: Optional[aiohttp.ClientTimeout] = None,
+    ) -> TextResponse:
+        """
+        Download a URL, revalidating against previous validators.
+
+        Args:
+            url: URL to download
+            etag: ETag from the previous response, sent as If-None-Match
+            last_modified: Last-Modified from the previous response, sent as If-Modified-Since
+            headers: Optional HTTP headers
+            timeout: Optional per-request timeout; defaults to the session's
+
+        Returns:
+            TextResponse; ``body`` is None when the server answered 304 Not Modified
+        """
+        if self.session is None:
+            raise RuntimeError("Session not initialized. Use 'async with' context manager.")
+
+        request_headers = dict(self._merge_headers(headers) or {})
+        if etag:
+            request_headers["If-None-Match"] = etag
+        if last_modified:
+            request_headers["If-Modified-Since"] = last_modified
+
+        options = {} if timeout is None else {"timeout": timeout}
+        async with self.session.get(url, headers=request_headers or None, **options) as response:
+            if response.status == 304:
+                return TextResponse(
+                    status=304,
+                    body=None,
+                    etag=response.headers.get("ETag", etag),
+                    last_modified=response.headers.get("Last-Modified", last_modified),
+                )
+            response.raise_for_status()
+            return TextResponse(
+                status=response.status,
+                body=await response.read(),
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+                encoding=response.charset or "utf-8",
+            )
+
+    def _merge_headers(self, headers: Optional[dict]) -> Optional[dict]:
+        if not self.headers:
+            return headers
+        if not headers:
+            return self.headers
+        return {**self.headers, **headers}
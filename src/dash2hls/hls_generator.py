@@ -1,5 +1,6 @@
 """Generate HLS playlists from decrypted segments."""
 
+import os
 from pathlib import Path
 from typing import List, Optional
 
@@ -124,10 +125,15 @@ class HlsGenerator:
     def write_playlist(path: Path, content: str) -> None:
         """
         Write playlist content to file.
-        
+
+        The file is replaced atomically, so a reader never sees a partially
+        written playlist.
+
         Args:
             path: Output file path
             content: Playlist content
         """
         path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(content, encoding="utf-8")
+        partial = path.with_name(f".{path.name}.tmp")
+        partial.write_text(content, encoding="utf-8")
+        os.replace(partial, path)
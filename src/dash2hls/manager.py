@@ -4,30 +4,81 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 from uuid import uuid4
 
-from .models import StreamConfig, StreamInfo
+import aiohttp
+
+from .downloader import create_http_session
+from .models import StreamConfig, StreamEvent, StreamInfo
 from .session import StreamSession
 
 logger = logging.getLogger(__name__)
 
 
+def _pool_context() -> multiprocessing.context.BaseContext:
+    # forkserver children start from a clean single-threaded server process;
+    # platforms without it (Windows) fall back to spawn.
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["dash2hls.dash_parser"])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
 class StreamManager:
     """Manages multiple DASH to HLS conversion streams."""
 
-    def __init__(self, base_output_dir: Path = Path("output")) -> None:
+    def __init__(
+        self,
+        base_output_dir: Path = Path("output"),
+        *,
+        init_cache_dir: Optional[Path] = None,
+    ) -> None:
         """
         Initialize the stream manager.
 
         Args:
             base_output_dir: Base directory for output files
+            init_cache_dir: Directory caching raw init segments across streams
+                and restarts. Defaults to ``.dash2hls_init_cache`` beside
+                ``base_output_dir``; it must not be served over HTTP.
         """
         self.base_output_dir = base_output_dir
         self.base_output_dir.mkdir(parents=True, exist_ok=True)
+        self.init_cache_dir = init_cache_dir or (
+            base_output_dir.resolve().parent / ".dash2hls_init_cache"
+        )
         self._sessions: Dict[str, StreamSession] = {}
         self._lock = asyncio.Lock()
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._resolved_roots: Dict[str, str] = {}
+        # Created on first use: aiohttp sessions must be built inside the event loop.
+        self._http: Optional[aiohttp.ClientSession] = None
+        # Parses large MPDs off the event loop; see session.LARGE_MPD_SIZE.
+        self._parse_pool: Optional[ProcessPoolExecutor] = None
+
+    async def start(self) -> None:
+        """Prepare the manager for serving requests."""
+
+    async def close(self) -> None:
+        """Stop every stream owned by this manager."""
+        async with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+            self._resolved_roots.clear()
+        for session in sessions:
+            await session.stop()
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(wait=False, cancel_futures=True)
+            self._parse_pool = None
 
     async def add_stream(self, config: StreamConfig) -> str:
         """
@@ -42,10 +93,28 @@ class StreamManager:
         stream_id = str(uuid4())
 
         async with self._lock:
-            session = StreamSession(stream_id, config, self.base_output_dir)
+            if self._http is None or self._http.closed:
+                self._http = create_http_session()
+            if self._parse_pool is None:
+                # Worker processes are only spawned once a large MPD shows up.
+                # By then the server runs many threads, so never fork it.
+                self._parse_pool = ProcessPoolExecutor(
+                    max_workers=min(4, os.cpu_count() or 1), mp_context=_pool_context()
+                )
+            session = StreamSession(
+                stream_id,
+                config,
+                self.base_output_dir,
+                http=self._http,
+                parse_pool=self._parse_pool,
+                on_change=self._on_session_change,
+                init_cache_dir=self.init_cache_dir,
+            )
             self._sessions[stream_id] = session
+            self._resolved_roots[stream_id] = os.path.realpath(session.output_dir)
             await session.start()
 
+        self._emit(StreamEvent("added", stream_id, session.info()))
         logger.info("Added stream %s from %s", stream_id, config.mpd_url)
         return stream_id
 
@@ -61,11 +130,15 @@ class StreamManager:
         """
         async with self._lock:
             session = self._sessions.pop(stream_id, None)
+            self._resolved_roots.pop(stream_id, None)
             if session:
                 await session.stop()
                 logger.info("Removed stream %s", stream_id)
-                return True
-            return False
+            else:
+                return False
+
+        self._emit(StreamEvent("removed", stream_id))
+        return True
 
     async def get_stream_info(self, stream_id: str) -> Optional[StreamInfo]:
         """
@@ -94,7 +167,91 @@ class StreamManager:
                 result.append(info)
         return result
 
+    async def get_stream_dict(self, stream_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the JSON view of a stream, as served by the API.
+
+        Args:
+            stream_id: Stream ID
+
+        Returns:
+            Dictionary or None if not found
+        """
+        session = self._sessions.get(stream_id)
+        return session.info_dict() if session else None
+
+    async def list_stream_dicts(self) -> List[Dict[str, Any]]:
+        """
+        List the JSON views of all active streams.
+
+        Returns:
+            List of dictionaries, one per stream
+        """
+        return [session.info_dict() for session in list(self._sessions.values())]
+
     def get_output_path(self, stream_id: str) -> Optional[Path]:
         """Get the output directory for a stream."""
         session = self._sessions.get(stream_id)
         return session.output_dir if session else None
+
+    def resolved_root(self, stream_id: str) -> Optional[str]:
+        """
+        Get the canonical (symlink-free, absolute) output directory of a stream.
+
+        The path is resolved once per stream and cached, keeping filesystem
+        lookups off the segment-serving path.
+
+        Args:
+            stream_id: Stream ID
+
+        Returns:
+            Directory as a string, or None if the stream is unknown
+        """
+        root = self._resolved_roots.get(stream_id)
+        if root is None:
+            output_path = self.get_output_path(stream_id)
+            if output_path is None:
+                return None
+            root = self._resolved_roots[stream_id] = os.path.realpath(output_path)
+        return root
+
+    async def resolve_root(self, stream_id: str) -> Optional[str]:
+        """
+        Like resolved_root, but may look the stream up in a shared registry.
+
+        Args:
+            stream_id: Stream ID
+
+        Returns:
+            Directory as a string, or None if the stream is unknown
+        """
+        return self.resolved_root(stream_id)
+
+    def subscribe(self, maxsize: int = 256) -> asyncio.Queue:
+        """
+        Register a listener for stream events.
+
+        Args:
+            maxsize: Events buffered before the oldest ones are dropped
+
+        Returns:
+            Queue receiving StreamEvent objects until unsubscribe() is called
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        """Stop delivering events to a queue returned by subscribe()."""
+        self._subscribers.discard(queue)
+
+    def _on_session_change(self, info: StreamInfo) -> None:
+        if info.stream_id in self._sessions:
+            self._emit(StreamEvent("updated", info.stream_id, info))
+
+    def _emit(self, event: StreamEvent) -> None:
+        for queue in list(self._subscribers):
+            if queue.full():
+                # A slow client only needs the latest state, not every step.
+                queue.get_nowait()
+            queue.put_nowait(event)
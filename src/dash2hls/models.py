@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
+import math
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, Mapping, Optional, TypeVar
+
+_Number = TypeVar("_Number", int, float)
 
 
 class StreamStatus(str, Enum):
@@ -18,8 +21,11 @@ class StreamStatus(str, Enum):
     STOPPED = "stopped"
     ERROR = "error"
 
+    def __str__(self) -> str:
+        return self.value
+
 
-@dataclass
+@dataclass(slots=True)
 class StreamConfig:
     """Configuration for a stream session."""
 
@@ -32,12 +38,48 @@ class StreamConfig:
     label: Optional[str] = None
     poll_interval: float = 4.0
     window_size: int = 6
-    history_size: int = 64
+    max_parallel: int = 6
     output_dir: Optional[Path] = None
     headers: Dict[str, str] | None = None
 
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> StreamConfig:
+        """
+        Build a configuration from a decoded JSON payload.
+
+        Args:
+            data: Request payload; ``keys`` is accepted as an alias of ``key_map``.
+                Unknown keys, such as the retired ``history_size``, are ignored.
+
+        Returns:
+            Validated StreamConfig
+
+        Raises:
+            ValueError: If a field is missing or has an invalid value
+        """
+        mpd_url = _optional_str(data, "mpd_url")
+        if not mpd_url:
+            raise ValueError("mpd_url is required")
 
-@dataclass
+        output_dir = _optional_str(data, "output_dir")
+
+        return cls(
+            mpd_url=mpd_url,
+            key=_optional_str(data, "key"),
+            kid=_optional_str(data, "kid"),
+            key_map=_optional_str_map(data, "key_map") or _optional_str_map(data, "keys"),
+            mp4decrypt_path=_optional_str(data, "mp4decrypt_path"),
+            representation_id=_optional_str(data, "representation_id"),
+            label=_optional_str(data, "label"),
+            poll_interval=_number(data, "poll_interval", 4.0, float, minimum=0.1),
+            window_size=_number(data, "window_size", 6, int, minimum=0),
+            max_parallel=_number(data, "max_parallel", 6, int, minimum=1),
+            headers=_optional_str_map(data, "headers"),
+            output_dir=Path(output_dir) if output_dir else None,
+        )
+
+
+@dataclass(slots=True)
 class StreamInfo:
     """Information about a running or completed stream."""
 
@@ -57,3 +99,82 @@ class StreamInfo:
     audio_representation_id: Optional[str] = None
     audio_bandwidth: Optional[int] = None
     audio_codecs: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Public JSON view of the stream; the local output_dir is not exposed."""
+        return {
+            "stream_id": self.stream_id,
+            "mpd_url": self.mpd_url,
+            "status": self.status.value,
+            "hls_url": self.hls_url,
+            "is_live": self.is_live,
+            "representation_id": self.representation_id,
+            "bandwidth": self.bandwidth,
+            "codecs": self.codecs,
+            "resolution": self.resolution,
+            "error": self.error,
+            "label": self.label,
+            "last_sequence": self.last_sequence,
+            "audio_representation_id": self.audio_representation_id,
+            "audio_bandwidth": self.audio_bandwidth,
+            "audio_codecs": self.audio_codecs,
+        }
+
+
+@dataclass(slots=True)
+class StreamEvent:
+    """A change to the set of streams: "added", "updated" or "removed"."""
+
+    kind: str
+    stream_id: str
+    info: Optional[StreamInfo] = None
+
+
+def _optional_str(data: Mapping[str, Any], name: str) -> Optional[str]:
+    value = data.get(name)
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        raise ValueError(f"{name} must be a string")
+    return value
+
+
+def _optional_str_map(data: Mapping[str, Any], name: str) -> Optional[Dict[str, str]]:
+    value = data.get(name)
+    if value is None:
+        return None
+    if not isinstance(value, dict) or not all(
+        isinstance(k, str) and isinstance(v, str) for k, v in value.items()
+    ):
+        raise ValueError(f"{name} must be an object mapping strings to strings")
+    return value
+
+
+def _number(
+    data: Mapping[str, Any],
+    name: str,
+    default: _Number,
+    cast: Callable[[Any], _Number],
+    *,
+    minimum: _Number,
+) -> _Number:
+    value = data.get(name)
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        raise ValueError(f"{name} must be a number")
+    if not isinstance(value, (int, float)):
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} must be a number") from None
+    # NaN slips through every comparison below and inf is never a sane setting.
+    if isinstance(value, float) and not math.isfinite(value):
+        raise ValueError(f"{name} must be a finite number")
+    if cast is int and isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f"{name} must be an integer")
+    value = cast(value)
+    if value < minimum:
+        raise ValueError(f"{name} must be at least {minimum}")
+    return value
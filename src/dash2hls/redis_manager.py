@@ -0,0 +1,304 @@
+"""Redis-backed stream registry shared by several server workers."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+from uuid import uuid4
+
+import orjson
+
+from .manager import StreamManager
+from .models import StreamConfig, StreamEvent, StreamInfo, StreamStatus
+
+try:  # pragma: no cover - optional dependency
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - optional dependency
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+
+def _encode_info(info: StreamInfo, owner: str) -> bytes:
+    record = info.to_dict()
+    record["output_dir"] = str(info.output_dir)
+    record["owner"] = owner
+    return orjson.dumps(record)
+
+
+def _decode_info(raw: bytes | str) -> tuple[StreamInfo, Optional[str]]:
+    """Decode a stream record into its info and the id of the owning worker."""
+    record = orjson.loads(raw)
+    owner = record.pop("owner", None)
+    record["status"] = StreamStatus(record["status"])
+    record["output_dir"] = Path(record["output_dir"])
+    if record.get("resolution"):
+        record["resolution"] = tuple(record["resolution"])
+    return StreamInfo(**record), owner
+
+
+class RedisStreamManager(StreamManager):
+    """StreamManager that publishes its stream records to Redis.
+
+    Sessions keep running inside the worker that created them. Every worker
+    mirrors its records into a Redis hash and announces additions, updates and
+    removals on a pub/sub channel, so any worker behind the reverse proxy can
+    list streams, push their changes to the UI, serve their output and route a
+    removal to the owning worker. Each worker also refreshes an expiring
+    heartbeat key; records whose owner's heartbeat has lapsed (a crashed
+    worker) are dropped from the hash.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        base_output_dir: Path = Path("output"),
+        *,
+        key_prefix: str = "dash2hls",
+        sync_interval: float = 2.0,
+        init_cache_dir: Optional[Path] = None,
+    ) -> None:
+        """
+        Initialize the Redis-backed manager.
+
+        Args:
+            redis_url: Redis connection URL (e.g. redis://localhost:6379/0)
+            base_output_dir: Base directory for output files, shared by all workers
+            key_prefix: Prefix for the Redis hash and pub/sub channel names
+            sync_interval: Seconds between refreshes of this worker's records
+                and heartbeat
+            init_cache_dir: Directory caching raw init segments; see StreamManager
+        """
+        if aioredis is None:
+            raise RuntimeError(
+                "RedisStreamManager requires the 'redis' package. Install dash2hls[redis]."
+            )
+        super().__init__(base_output_dir, init_cache_dir=init_cache_dir)
+        self.worker_id = str(uuid4())
+        self.sync_interval = sync_interval
+        self._redis = aioredis.from_url(redis_url)
+        self._records_key = f"{key_prefix}:streams"
+        self._events_channel = f"{key_prefix}:events"
+        self._heartbeat_prefix = f"{key_prefix}:worker:"
+        # A worker is considered gone after missing a few heartbeats.
+        self._heartbeat_ttl = max(10, int(sync_interval * 5))
+        self._remote_paths: Dict[str, Path] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._pending_publishes: Set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        """Subscribe to stream events and start syncing local records."""
+        await self._heartbeat()
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(self._events_channel)
+        self._tasks = [
+            asyncio.create_task(self._listen(pubsub), name="dash2hls-redis-events"),
+            asyncio.create_task(self._sync_loop(), name="dash2hls-redis-sync"),
+        ]
+
+    async def close(self) -> None:
+        """Stop local streams, drop their records and disconnect from Redis."""
+        for task in self._tasks:
+            task.cancel()
+        # A task that already died must not keep the sessions below alive.
+        for result in await asyncio.gather(*self._tasks, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.error("Redis background task failed: %s", result)
+        self._tasks = []
+        for task in list(self._pending_publishes):
+            task.cancel()
+
+        local_ids = list(self._sessions)
+        await super().close()
+        try:
+            if local_ids:
+                await self._redis.hdel(self._records_key, *local_ids)
+            await self._redis.delete(self._heartbeat_prefix + self.worker_id)
+        except Exception:
+            logger.exception("Failed to remove this worker's records from Redis")
+        finally:
+            await self._redis.aclose()
+
+    async def add_stream(self, config: StreamConfig) -> str:
+        stream_id = await super().add_stream(config)
+        record = _encode_info(self._sessions[stream_id].info(), self.worker_id)
+        await self._redis.hset(self._records_key, stream_id, record)
+        await self._publish("added", stream_id, record=record.decode())
+        return stream_id
+
+    async def remove_stream(self, stream_id: str) -> bool:
+        if await super().remove_stream(stream_id):
+            await self._redis.hdel(self._records_key, stream_id)
+            await self._publish("removed", stream_id)
+            return True
+
+        if await self._remote_info(stream_id) is None:
+            return False
+
+        # Owned by another, live worker: ask it to stop the session.
+        await self._publish("remove", stream_id)
+        return True
+
+    async def get_stream_info(self, stream_id: str) -> Optional[StreamInfo]:
+        info = await super().get_stream_info(stream_id)
+        if info is not None:
+            return info
+        return await self._remote_info(stream_id)
+
+    async def list_streams(self) -> List[StreamInfo]:
+        # Local sessions are read from memory; the hash only supplies the
+        # records of other workers.
+        result = await super().list_streams()
+        records = await self._redis.hgetall(self._records_key)
+
+        remote = []
+        for stream_id, raw in records.items():
+            stream_id = stream_id.decode() if isinstance(stream_id, bytes) else stream_id
+            if stream_id not in self._sessions:
+                remote.append((stream_id, *_decode_info(raw)))
+        live = await self._live_owners({owner for _, _, owner in remote})
+
+        stale = []
+        for stream_id, info, owner in remote:
+            if owner in live:
+                self._remote_paths[stream_id] = info.output_dir
+                result.append(info)
+            else:
+                stale.append(stream_id)
+        await self._drop_records(stale)
+        return result
+
+    async def resolve_root(self, stream_id: str) -> Optional[str]:
+        root = await super().resolve_root(stream_id)
+        if root is None and await self._remote_info(stream_id) is not None:
+            root = self.resolved_root(stream_id)
+        return root
+
+    async def get_stream_dict(self, stream_id: str) -> Optional[Dict[str, Any]]:
+        stream = await super().get_stream_dict(stream_id)
+        if stream is not None:
+            return stream
+        info = await self.get_stream_info(stream_id)
+        return info.to_dict() if info else None
+
+    async def list_stream_dicts(self) -> List[Dict[str, Any]]:
+        return [info.to_dict() for info in await self.list_streams()]
+
+    def get_output_path(self, stream_id: str) -> Optional[Path]:
+        return super().get_output_path(stream_id) or self._remote_paths.get(stream_id)
+
+    def _on_session_change(self, info: StreamInfo) -> None:
+        super()._on_session_change(info)
+        if info.stream_id not in self._sessions:
+            return
+        record = _encode_info(info, self.worker_id)
+        task = asyncio.get_running_loop().create_task(
+            self._publish("updated", info.stream_id, record=record.decode())
+        )
+        self._pending_publishes.add(task)
+        task.add_done_callback(self._publish_done)
+
+    def _publish_done(self, task: asyncio.Task) -> None:
+        self._pending_publishes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Failed to publish stream update: %s", task.exception())
+
+    async def _publish(self, event: str, stream_id: str, **payload: str) -> None:
+        message = {"event": event, "stream_id": stream_id, "worker": self.worker_id, **payload}
+        await self._redis.publish(self._events_channel, orjson.dumps(message))
+
+    async def _sync_local_records(self) -> None:
+        if not self._sessions:
+            return
+        mapping = {
+            stream_id: _encode_info(session.info(), self.worker_id)
+            for stream_id, session in list(self._sessions.items())
+        }
+        await self._redis.hset(self._records_key, mapping=mapping)
+
+    async def _sync_loop(self) -> None:
+        while True:
+            try:
+                await self._heartbeat()
+                await self._sync_local_records()
+            except Exception:
+                logger.exception("Failed to sync stream records to Redis")
+            await asyncio.sleep(self.sync_interval)
+
+    async def _heartbeat(self) -> None:
+        await self._redis.set(
+            self._heartbeat_prefix + self.worker_id, b"1", ex=self._heartbeat_ttl
+        )
+
+    async def _live_owners(self, owners: Set[Optional[str]]) -> Set[Optional[str]]:
+        """Return the subset of worker ids whose heartbeat has not expired."""
+        owners = {owner for owner in owners if owner}
+        if not owners:
+            return set()
+        ordered = list(owners)
+        beats = await self._redis.mget([self._heartbeat_prefix + owner for owner in ordered])
+        return {owner for owner, beat in zip(ordered, beats) if beat is not None}
+
+    async def _remote_info(self, stream_id: str) -> Optional[StreamInfo]:
+        """Fetch another worker's record, dropping it if that worker is gone."""
+        raw = await self._redis.hget(self._records_key, stream_id)
+        if raw is None:
+            return None
+        info, owner = _decode_info(raw)
+        if owner not in await self._live_owners({owner}):
+            await self._drop_records([stream_id])
+            return None
+        self._remote_paths[stream_id] = info.output_dir
+        return info
+
+    async def _drop_records(self, stream_ids: List[str]) -> None:
+        if not stream_ids:
+            return
+        logger.warning("Dropping streams of workers that stopped heartbeating: %s", stream_ids)
+        await self._redis.hdel(self._records_key, *stream_ids)
+        for stream_id in stream_ids:
+            self._remote_paths.pop(stream_id, None)
+            self._resolved_roots.pop(stream_id, None)
+
+    async def _listen(self, pubsub) -> None:
+        while True:
+            try:
+                if pubsub is None:
+                    pubsub = self._redis.pubsub()
+                    await pubsub.subscribe(self._events_channel)
+                    logger.info("Resubscribed to Redis stream events")
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        await self._handle_event(orjson.loads(message["data"]))
+                    except Exception:
+                        logger.exception("Failed to handle stream event %r", message.get("data"))
+            except Exception:
+                logger.exception("Lost the Redis event subscription; retrying")
+            finally:
+                if pubsub is not None:
+                    with contextlib.suppress(Exception):
+                        await pubsub.aclose()
+                    pubsub = None
+            await asyncio.sleep(self.sync_interval)
+
+    async def _handle_event(self, event: dict) -> None:
+        stream_id = event.get("stream_id")
+        if not stream_id or event.get("worker") == self.worker_id:
+            return
+
+        kind = event.get("event")
+        if kind in ("added", "updated") and event.get("record"):
+            info, _ = _decode_info(event["record"])
+            self._remote_paths[stream_id] = info.output_dir
+            self._emit(StreamEvent(kind, stream_id, info))
+        elif kind == "removed":
+            self._remote_paths.pop(stream_id, None)
+            self._resolved_roots.pop(stream_id, None)
+            self._emit(StreamEvent("removed", stream_id))
+        elif kind == "remove" and stream_id in self._sessions:
+            await self.remove_stream(stream_id)
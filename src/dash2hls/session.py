@@ -3,26 +3,59 @@
 from __future__ import annotations
 
 import asyncio
+import bisect
+import contextlib
+import hashlib
 import logging
+import sys
 from collections import deque
+from concurrent.futures import BrokenExecutor, Executor
+from operator import attrgetter
 from pathlib import Path
-from typing import Deque, Optional
+from typing import Callable, Optional
 
 import aiohttp
+import orjson
 
 from .dash_parser import DashManifest, DashParser, DashRepresentation, DashSegment
 from .decryptor import DecryptionError, build_decryptor
-from .downloader import SegmentDownloader
+from .downloader import SegmentDownloader, check_http_parser, create_http_session
 from .hls_writer import HLSWriter, MultiVariantHLSWriter
 from .models import StreamConfig, StreamInfo, StreamStatus
 
 logger = logging.getLogger(__name__)
 
+# MPDs above this many bytes are parsed in the manager's process pool;
+# smaller ones parse on a thread, cheaper than the pickle round trip.
+LARGE_MPD_SIZE = 256_000
+
+# Upper bound on init segments kept in the manager's init cache.
+INIT_CACHE_MAX_ENTRIES = 256
+
+_segment_number = attrgetter("number")
+
+# asyncio.timeout() arrived in Python 3.11.
+_HAS_ASYNCIO_TIMEOUT = sys.version_info >= (3, 11)
+
+
+def _bandwidth(rep: DashRepresentation) -> int:
+    return rep.bandwidth or 0
+
 
 class StreamSession:
     """Manages the end-to-end lifecycle of a DASH to HLS stream."""
 
-    def __init__(self, stream_id: str, config: StreamConfig, base_output_dir: Path) -> None:
+    def __init__(
+        self,
+        stream_id: str,
+        config: StreamConfig,
+        base_output_dir: Path,
+        *,
+        http: Optional[aiohttp.ClientSession] = None,
+        parse_pool: Optional[Executor] = None,
+        on_change: Optional[Callable[[StreamInfo], None]] = None,
+        init_cache_dir: Optional[Path] = None,
+    ) -> None:
         self.id = stream_id
         self.config = config
         self.output_dir = config.output_dir or (base_output_dir / stream_id)
@@ -32,17 +65,38 @@ class StreamSession:
         self.error: Optional[str] = None
         self.is_live: bool = True
 
+        self._http = http
+        self._parse_pool = parse_pool
+        # Raw init segments keyed by a hash of their URL, shared by every
+        # stream of the manager; None disables the cache.
+        self._init_cache_dir = init_cache_dir
         self._decryptor = None
         self._task: Optional[asyncio.Task] = None
         self._stop_event = asyncio.Event()
+        # Caps segment downloads across all of this stream's tracks so the
+        # pipeline's fan-out does not provoke 429s from the CDN.
+        self._download_slots = asyncio.Semaphore(config.max_parallel)
         self._video_representation: Optional[DashRepresentation] = None
         self._audio_representation: Optional[DashRepresentation] = None
         self._hls_writer: Optional[MultiVariantHLSWriter] = None
 
-        self._history_limit = self.config.history_size or 128
-        self._processed_numbers: dict[str, Deque[int]] = {}
-        self._processed_set: dict[str, set[int]] = {}
-        self._last_sequences: dict[str, Optional[int]] = {}
+        self._manifest: Optional[DashManifest] = None
+        self._mpd_body: Optional[bytes] = None
+        self._mpd_etag: Optional[str] = None
+        self._mpd_last_modified: Optional[str] = None
+        self._consecutive_empty_polls = 0
+
+        # Per-track high-water mark: DASH segment numbers only ever increase and
+        # segments are written in order, so this is the only dedup state needed.
+        self._last_sequences: dict[str, Optional[int]] = {"video": None, "audio": None}
+
+        self._on_change = on_change
+        self._hls_url = f"/hls/{stream_id}/master.m3u8"
+        # Representation-derived part of info(); reset when the selection changes.
+        self._info_base: Optional[tuple] = None
+        self._published_info: Optional[StreamInfo] = None
+        # JSON view served to API clients; rebuilt at most once per poll.
+        self._info_snapshot: Optional[dict] = None
 
     async def start(self) -> None:
         """Start background processing."""
@@ -63,8 +117,10 @@ class StreamSession:
             logger.exception("Decryptor initialisation failed for stream %s", self.id)
             raise
 
+        check_http_parser()
         self._stop_event.clear()
         self.status = StreamStatus.STARTING
+        self._info_snapshot = None
         self._task = asyncio.create_task(self._run_loop(), name=f"dash2hls-{self.id}")
 
     async def stop(self) -> None:
@@ -77,66 +133,112 @@ class StreamSession:
             except asyncio.CancelledError:
                 pass
         self.status = StreamStatus.STOPPED
+        self._notify_changed()
 
     def info(self) -> StreamInfo:
         """Return current information for this session."""
-        resolution = None
-        if self._video_representation and self._video_representation.width and self._video_representation.height:
-            resolution = (self._video_representation.width, self._video_representation.height)
-
-        video_bandwidth = self._video_representation.bandwidth if self._video_representation else None
-        audio_bandwidth = self._audio_representation.bandwidth if self._audio_representation else None
-
-        video_codecs = self._video_representation.codecs if self._video_representation else None
-        audio_codecs = self._audio_representation.codecs if self._audio_representation else None
-        codecs = video_codecs or audio_codecs
-
-        last_sequence = self._last_sequences.get("video")
+        last_sequence = self._last_sequences["video"]
         if last_sequence is None:
-            last_sequence = self._last_sequences.get("audio")
+            last_sequence = self._last_sequences["audio"]
 
+        if self._info_base is None:
+            self._info_base = self._representation_fields()
+        video_id, bandwidth, codecs, resolution, audio_id, audio_bandwidth, audio_codecs = (
+            self._info_base
+        )
         return StreamInfo(
             stream_id=self.id,
             mpd_url=self.config.mpd_url,
             status=self.status,
-            hls_url=f"/hls/{self.id}/master.m3u8",
+            hls_url=self._hls_url,
             output_dir=self.output_dir,
             is_live=self.is_live,
-            representation_id=self._video_representation.id if self._video_representation else None,
-            bandwidth=video_bandwidth,
+            representation_id=video_id,
+            bandwidth=bandwidth,
             codecs=codecs,
             resolution=resolution,
             error=self.error,
             label=self.config.label,
             last_sequence=last_sequence,
-            audio_representation_id=self._audio_representation.id if self._audio_representation else None,
+            audio_representation_id=audio_id,
             audio_bandwidth=audio_bandwidth,
             audio_codecs=audio_codecs,
         )
 
-    async def _run_loop(self) -> None:
-        timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=60)
-        headers = self.config.headers or {}
+    def _representation_fields(self) -> tuple:
+        """StreamInfo fields that only change when a different representation is selected."""
+        video = self._video_representation
+        audio = self._audio_representation
+
+        video_id = video_bandwidth = video_codecs = resolution = None
+        if video is not None:
+            video_id, video_bandwidth, video_codecs = video.id, video.bandwidth, video.codecs
+            if video.width and video.height:
+                resolution = (video.width, video.height)
+
+        audio_id = audio_bandwidth = audio_codecs = None
+        if audio is not None:
+            audio_id, audio_bandwidth, audio_codecs = audio.id, audio.bandwidth, audio.codecs
+
+        return (
+            video_id,
+            video_bandwidth,
+            video_codecs or audio_codecs,
+            resolution,
+            audio_id,
+            audio_bandwidth,
+            audio_codecs,
+        )
+
+    def info_dict(self) -> dict:
+        """Return the JSON view of this session as of its last poll."""
+        if self._info_snapshot is None:
+            self._info_snapshot = self.info().to_dict()
+        return self._info_snapshot
 
-        async with aiohttp.ClientSession(headers=headers, timeout=timeout) as session:
-            downloader = SegmentDownloader(session)
+    async def _run_loop(self) -> None:
+        async with contextlib.AsyncExitStack() as stack:
+            # The manager normally injects its shared client; a standalone
+            # session falls back to a private one.
+            http = self._http
+            if http is None:
+                http = await stack.enter_async_context(create_http_session())
+            downloader = SegmentDownloader(http, headers=self.config.headers)
 
             while not self._stop_event.is_set():
                 try:
-                    mpd_text = await downloader.download_text(self.config.mpd_url)
+                    response = await downloader.download_text_conditional(
+                        self.config.mpd_url,
+                        etag=self._mpd_etag,
+                        last_modified=self._mpd_last_modified,
+                    )
                 except Exception as exc:
                     self._record_error(f"Failed to download MPD: {exc}")
                     await self._sleep(self.config.poll_interval)
                     continue
 
-                try:
-                    manifest = DashParser.parse(mpd_text, self.config.mpd_url)
-                except Exception as exc:
-                    self._record_error(f"Failed to parse MPD: {exc}")
-                    await self._sleep(self.config.poll_interval)
-                    continue
-
-                self.is_live = manifest.is_live
+                manifest_changed = self._manifest is None or not (
+                    response.not_modified or response.body == self._mpd_body
+                )
+                if not manifest_changed:
+                    # Live MPDs are often byte-identical between polls even
+                    # when the origin sends no validators.
+                    manifest = self._manifest
+                else:
+                    try:
+                        manifest = await self._parse_manifest(response.body or b"")
+                    except Exception as exc:
+                        self._record_error(f"Failed to parse MPD: {exc}")
+                        await self._sleep(self.config.poll_interval)
+                        continue
+                    self._manifest = manifest
+                    self._mpd_body = response.body
+                self._mpd_etag = response.etag
+                self._mpd_last_modified = response.last_modified
+
+                if manifest.is_live != self.is_live:
+                    self.is_live = manifest.is_live
+                    self._info_base = None
 
                 if self._hls_writer is None:
                     self._hls_writer = MultiVariantHLSWriter(
@@ -145,15 +247,27 @@ class StreamSession:
                         window_size=self.config.window_size,
                     )
 
-                video_rep, audio_rep = self._select_representations(manifest)
+                if manifest_changed or (
+                    self._video_representation is None and self._audio_representation is None
+                ):
+                    video_rep, audio_rep = self._select_representations(manifest)
+                else:
+                    # Same manifest object, so the same selection.
+                    video_rep, audio_rep = self._video_representation, self._audio_representation
                 if video_rep is None and audio_rep is None:
                     self._record_error("No matching video or audio representation in manifest")
                     await self._sleep(self.config.poll_interval)
                     continue
 
-                self._video_representation = video_rep
-                self._audio_representation = audio_rep
+                if (
+                    video_rep is not self._video_representation
+                    or audio_rep is not self._audio_representation
+                ):
+                    self._video_representation = video_rep
+                    self._audio_representation = audio_rep
+                    self._info_base = None
 
+                has_new_segments = False
                 try:
                     await self._ensure_initialisation(downloader, video_rep, audio_rep)
                     
@@ -165,7 +279,8 @@ class StreamSession:
                     if audio_rep:
                         audio_new_segments = self._collect_new_segments(audio_rep.segments, track="audio")
                     
-                    if video_new_segments or audio_new_segments:
+                    has_new_segments = bool(video_new_segments or audio_new_segments)
+                    if has_new_segments:
                         await self._process_multivariant_segments(
                             downloader, video_rep, audio_rep, video_new_segments, audio_new_segments
                         )
@@ -177,8 +292,8 @@ class StreamSession:
                         video_complete = True
                         audio_complete = True
 
-                        video_last_seq = self._last_sequences.get("video")
-                        audio_last_seq = self._last_sequences.get("audio")
+                        video_last_seq = self._last_sequences["video"]
+                        audio_last_seq = self._last_sequences["audio"]
 
                         if video_rep and video_rep.segments:
                             last_video_sequence = video_rep.segments[-1].number
@@ -196,20 +311,36 @@ class StreamSession:
 
                         if video_complete and audio_complete:
                             if self._hls_writer:
-                                self._hls_writer.finalize()
+                                await asyncio.to_thread(self._hls_writer.finalize)
                             self.status = StreamStatus.COMPLETED
                             logger.info("Stream %s completed", self.id)
+                            self._notify_changed()
                             return
                 except asyncio.CancelledError:
                     raise
                 except Exception as exc:
                     self._record_error(str(exc))
 
-                poll = manifest.min_update_period or self.config.poll_interval
-                await self._sleep(poll)
+                await self._sleep(self._next_poll_interval(manifest, has_new_segments))
 
         if self.status not in (StreamStatus.ERROR, StreamStatus.COMPLETED):
             self.status = StreamStatus.STOPPED
+        self._notify_changed()
+
+    async def _parse_manifest(self, mpd_content: bytes) -> DashManifest:
+        if self._parse_pool is not None and len(mpd_content) > LARGE_MPD_SIZE:
+            # Parsing a large MPD holds the GIL long enough to stall every
+            # other stream's I/O, so it runs in another process.
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(
+                    self._parse_pool, DashParser.parse, mpd_content, self.config.mpd_url
+                )
+            except BrokenExecutor:
+                logger.warning("MPD parse pool is broken; parsing in a thread for stream %s", self.id)
+        # DashParser keeps no state between calls, so smaller MPDs can parse
+        # on a worker thread; lxml drops the GIL for much of the work.
+        return await asyncio.to_thread(DashParser.parse, mpd_content, self.config.mpd_url)
 
     async def _ensure_initialisation(
         self,
@@ -235,9 +366,11 @@ class StreamSession:
 
             if not video_state.init_written:
                 logger.info("Downloading video init segment for stream %s", self.id)
-                init_payload = await downloader.download(video_representation.init_url)
-                decrypted = await self._decrypt_segment(init_payload, video_representation.default_kid)
-                self._hls_writer.write_init("video", decrypted)
+                init_payload = await self._fetch_init(downloader, video_representation.init_url)
+                decrypted = await self._decrypt_segment(
+                    init_payload, video_representation.default_kid, "video"
+                )
+                await asyncio.to_thread(self._hls_writer.write_init, "video", decrypted)
                 logger.info("Video init segment written for stream %s", self.id)
 
         if audio_representation:
@@ -250,11 +383,51 @@ class StreamSession:
 
             if not audio_state.init_written:
                 logger.info("Downloading audio init segment for stream %s", self.id)
-                init_payload = await downloader.download(audio_representation.init_url)
-                decrypted = await self._decrypt_segment(init_payload, audio_representation.default_kid)
-                self._hls_writer.write_init("audio", decrypted)
+                init_payload = await self._fetch_init(downloader, audio_representation.init_url)
+                decrypted = await self._decrypt_segment(
+                    init_payload, audio_representation.default_kid, "audio"
+                )
+                await asyncio.to_thread(self._hls_writer.write_init, "audio", decrypted)
                 logger.info("Audio init segment written for stream %s", self.id)
 
+    async def _fetch_init(self, downloader: SegmentDownloader, url: str) -> bytes:
+        """Download an init segment, or reuse a cached copy the origin still serves."""
+        if self._init_cache_dir is None:
+            return await downloader.download(url)
+
+        # The payload is cached before decryption: the decryptor learns the
+        # track's protection parameters from the encrypted init segment.
+        # Request headers are part of the key so streams with different
+        # credentials never share an entry.
+        key = orjson.dumps([url, sorted((downloader.headers or {}).items())])
+        cache_path = self._init_cache_dir / hashlib.blake2b(key, digest_size=16).hexdigest()
+        cached = await asyncio.to_thread(_load_init, cache_path)
+        etag = last_modified = None
+        if cached is not None:
+            payload, etag, last_modified = cached
+
+        # Every reuse is revalidated with the origin; only the body transfer
+        # is saved.
+        response = await downloader.download_conditional(
+            url, etag=etag, last_modified=last_modified
+        )
+        if response.not_modified:
+            await asyncio.to_thread(_touch_init, cache_path)
+            return payload
+
+        payload = response.body
+        if not (response.etag or response.last_modified):
+            # Without validators a changed init segment could never be told
+            # apart from the cached one, so such responses are not kept.
+            return payload
+        try:
+            await asyncio.to_thread(
+                _store_init, cache_path, payload, response.etag, response.last_modified
+            )
+        except OSError as exc:
+            logger.warning("Could not cache init segment for stream %s: %s", self.id, exc)
+        return payload
+
     async def _process_multivariant_segments(
         self,
         downloader: SegmentDownloader,
@@ -263,22 +436,34 @@ class StreamSession:
         video_segments: list[DashSegment],
         audio_segments: list[DashSegment],
     ) -> None:
+        # Each track runs its own pipeline; run them side by side so audio
+        # does not wait for the (much larger) video batch to finish.
+        pipelines = []
         if video_representation and video_segments:
-            await self._process_track_segments(
-                track="video",
-                downloader=downloader,
-                representation=video_representation,
-                segments=video_segments,
+            pipelines.append(
+                self._process_track_segments(
+                    track="video",
+                    downloader=downloader,
+                    representation=video_representation,
+                    segments=video_segments,
+                )
             )
-
         if audio_representation and audio_segments:
-            await self._process_track_segments(
-                track="audio",
-                downloader=downloader,
-                representation=audio_representation,
-                segments=audio_segments,
+            pipelines.append(
+                self._process_track_segments(
+                    track="audio",
+                    downloader=downloader,
+                    representation=audio_representation,
+                    segments=audio_segments,
+                )
             )
 
+        # A failing track does not cut the other one short; the first error
+        # is raised once both are done.
+        for result in await asyncio.gather(*pipelines, return_exceptions=True):
+            if isinstance(result, BaseException):
+                raise result
+
     async def _process_track_segments(
         self,
         track: str,
@@ -286,97 +471,299 @@ class StreamSession:
         representation: DashRepresentation,
         segments: list[DashSegment],
     ) -> None:
-        for segment in segments:
-            if self._stop_event.is_set():
-                break
+        # Download -> decrypt -> write as three stages joined by bounded
+        # queues, so the network, mp4decrypt and disk work overlap and a slow
+        # stage holds back the ones before it instead of buffering segments.
+        depth = self.config.window_size or 4
+        decrypt_queue: asyncio.Queue = asyncio.Queue(maxsize=depth)
+        write_queue: asyncio.Queue = asyncio.Queue(maxsize=depth)
+
+        stages = [
+            asyncio.create_task(self._download_stage(downloader, segments, decrypt_queue, depth)),
+            asyncio.create_task(
+                self._decrypt_stage(track, representation.default_kid, decrypt_queue, write_queue)
+            ),
+            asyncio.create_task(self._write_stage(track, write_queue)),
+        ]
+        if not await self._join_stages(stages):
+            return
+
+        # Segments before a failed download are written so the playlist still
+        # advances; the failure surfaces once they are out.
+        download_error = stages[0].result()
+        if download_error is not None:
+            raise download_error
+
+    async def _join_stages(self, stages: list[asyncio.Task]) -> bool:
+        """
+        Wait for all stages, cancelling the rest as soon as one fails.
+
+        Works like asyncio.TaskGroup (which needs Python 3.11) and also
+        cancels the stages when the session is asked to stop.
+
+        Returns:
+            True if every stage finished, False if the session was stopped
+        """
+        stopped = asyncio.create_task(self._stop_event.wait())
+        pending = set(stages)
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending | {stopped}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if stopped in done:
+                    return False
+                for stage in done:
+                    if stage.exception() is not None:
+                        raise stage.exception()
+                pending -= done
+            return True
+        finally:
+            stopped.cancel()
+            for stage in stages:
+                stage.cancel()
+            await asyncio.gather(stopped, *stages, return_exceptions=True)
+
+    async def _download_stage(
+        self,
+        downloader: SegmentDownloader,
+        segments: list[DashSegment],
+        sink: asyncio.Queue,
+        depth: int,
+    ) -> Optional[Exception]:
+        """Download up to ``depth`` segments at a time and queue them in order."""
+        in_flight: deque[tuple[DashSegment, asyncio.Task]] = deque()
+        error: Optional[Exception] = None
+        try:
+            for segment in segments:
+                in_flight.append((segment, asyncio.create_task(self._fetch(downloader, segment))))
+                if len(in_flight) >= depth:
+                    done, task = in_flight.popleft()
+                    await sink.put((done, await task))
+            while in_flight:
+                done, task = in_flight.popleft()
+                await sink.put((done, await task))
+        except Exception as exc:
+            error = exc
+        finally:
+            for _, task in in_flight:
+                task.cancel()
+        await sink.put(None)
+        return error
+
+    async def _fetch(self, downloader: SegmentDownloader, segment: DashSegment) -> bytes:
+        async with self._download_slots:
+            return await downloader.download(segment.url)
+
+    async def _decrypt_stage(
+        self, track: str, kid: Optional[str], source: asyncio.Queue, sink: asyncio.Queue
+    ) -> None:
+        """Decrypt whatever has queued up in one decryptor call per batch."""
+        finished = False
+        while not finished:
+            batch = [await source.get()]
+            while not source.empty():
+                batch.append(source.get_nowait())
+            if batch[-1] is None:
+                batch.pop()
+                finished = True
+            if not batch:
+                continue
 
-            payload = await downloader.download(segment.url)
-            decrypted = await self._decrypt_segment(payload, representation.default_kid)
+            decrypted = await self._decrypt_segments([payload for _, payload in batch], kid, track)
+            for (segment, _), data in zip(batch, decrypted):
+                await sink.put((segment, data))
+        await sink.put(None)
 
-            if not self._hls_writer:
-                raise RuntimeError("HLS writer not initialised")
+    async def _write_stage(self, track: str, source: asyncio.Queue) -> None:
+        """Write decrypted segments in order, off the event loop."""
+        if not self._hls_writer:
+            raise RuntimeError("HLS writer not initialised")
 
-            self._hls_writer.add_segment(track, segment.number, segment.duration, decrypted)
+        while (item := await source.get()) is not None:
+            segment, data = item
+            write = asyncio.ensure_future(
+                asyncio.to_thread(
+                    self._hls_writer.add_segment, track, segment.number, segment.duration, data
+                )
+            )
+            try:
+                await asyncio.shield(write)
+            except asyncio.CancelledError:
+                # Let a write that already started finish so the playlist is
+                # never left half-updated for the next poll.
+                await write
+                raise
             self._mark_processed(track, segment.number)
-            self._last_sequences[track] = segment.number
 
             logger.debug("Processed %s segment %s for stream %s", track, segment.number, self.id)
 
-    def _ensure_track_state(self, track: str) -> tuple[Deque[int], set[int]]:
-        if track not in self._processed_numbers:
-            self._processed_numbers[track] = deque()
-            self._processed_set[track] = set()
-            self._last_sequences[track] = None
-        return self._processed_numbers[track], self._processed_set[track]
-
     def _collect_new_segments(self, segments: list[DashSegment], *, track: str) -> list[DashSegment]:
-        numbers, processed_set = self._ensure_track_state(track)
-        last_sequence = self._last_sequences.get(track)
-
-        fresh: list[DashSegment] = []
-        for segment in segments:
-            number = segment.number
-            if number is None:
-                continue
-            if number in processed_set:
-                continue
-            if last_sequence is not None and number <= last_sequence:
-                continue
-            fresh.append(segment)
-        return fresh
+        last_sequence = self._last_sequences[track]
+        if last_sequence is None:
+            return [segment for segment in segments if segment.number is not None]
+        if not segments:
+            return []
+
+        # Segments are listed in ascending order, so the common cases are O(1):
+        # nothing new, or numbers contiguous up to the mark so the first unseen
+        # segment sits at a computable index. Gaps fall back to a binary search.
+        last_listed = segments[-1].number
+        first_listed = segments[0].number
+        if first_listed is None or last_listed is None:
+            return [
+                segment
+                for segment in segments
+                if segment.number is not None and segment.number > last_sequence
+            ]
+        if last_listed <= last_sequence:
+            return []
+
+        start = last_sequence - first_listed + 1
+        if (
+            0 < start < len(segments)
+            and segments[start - 1].number == last_sequence
+            and segments[start].number == last_sequence + 1
+        ):
+            return segments[start:]
+        return segments[bisect.bisect_right(segments, last_sequence, key=_segment_number):]
 
     def _mark_processed(self, track: str, number: int) -> None:
-        numbers, processed_set = self._ensure_track_state(track)
-        if number in processed_set:
-            return
-        processed_set.add(number)
-        numbers.append(number)
-
-        while len(numbers) > self._history_limit:
-            oldest = numbers.popleft()
-            processed_set.discard(oldest)
+        last_sequence = self._last_sequences[track]
+        if last_sequence is None or number > last_sequence:
+            self._last_sequences[track] = number
 
     def _select_representations(
         self, manifest: DashManifest
     ) -> tuple[Optional[DashRepresentation], Optional[DashRepresentation]]:
-        video_representation: Optional[DashRepresentation] = None
-        audio_representation: Optional[DashRepresentation] = None
-
         if self.config.representation_id:
-            for rep in manifest.representations:
-                if rep.id == self.config.representation_id:
-                    video_representation = rep
-                    break
+            video_representation = manifest.representations_by_id.get(self.config.representation_id)
         else:
-            video_reps = [rep for rep in manifest.representations if rep.is_video]
-            if video_reps:
-                video_representation = max(video_reps, key=lambda rep: rep.bandwidth or 0)
-
-        audio_reps = [rep for rep in manifest.representations if rep.is_audio]
-        if audio_reps:
-            audio_representation = max(audio_reps, key=lambda rep: rep.bandwidth or 0)
+            video_representation = max(manifest.video_representations, key=_bandwidth, default=None)
+        audio_representation = max(manifest.audio_representations, key=_bandwidth, default=None)
 
         return video_representation, audio_representation
 
-    async def _decrypt_segment(self, payload: bytes, kid: Optional[str]) -> bytes:
+    async def _decrypt_segment(self, payload: bytes, kid: Optional[str], track: str) -> bytes:
+        if not self._decryptor:
+            raise RuntimeError("Decryptor not initialised")
+        try:
+            return await self._decryptor.decrypt_segment(payload, kid=kid, track=track)
+        except DecryptionError as exc:
+            logger.error("Decryption failed for stream %s: %s", self.id, exc)
+            raise
+
+    async def _decrypt_segments(
+        self, payloads: list[bytes], kid: Optional[str], track: str
+    ) -> list[bytes]:
         if not self._decryptor:
             raise RuntimeError("Decryptor not initialised")
         try:
-            return await self._decryptor.decrypt_segment(payload, kid=kid)
+            return await self._decryptor.decrypt_segments(payloads, kid=kid, track=track)
         except DecryptionError as exc:
             logger.error("Decryption failed for stream %s: %s", self.id, exc)
             raise
 
+    def _next_poll_interval(self, manifest: DashManifest, has_new_segments: bool) -> float:
+        """Poll sooner while segments keep arriving and back off on quiet streams."""
+        base = manifest.min_update_period or self.config.poll_interval
+        floor = manifest.min_update_period or self.config.poll_interval / 2
+        ceiling = max(floor, 4 * self.config.poll_interval)
+
+        if has_new_segments:
+            self._consecutive_empty_polls = 0
+            interval = base / 2
+        else:
+            # 1.5 ** 8 already exceeds the 4x ceiling; cap to keep the power bounded.
+            self._consecutive_empty_polls = min(self._consecutive_empty_polls + 1, 8)
+            interval = base * 1.5 ** self._consecutive_empty_polls
+
+        return min(max(interval, floor), ceiling)
+
     def _record_error(self, message: str) -> None:
         self.error = message
         self.status = StreamStatus.ERROR
         logger.error("Stream %s error: %s", self.id, message)
 
+    def _notify_changed(self) -> None:
+        """Refresh the cached view and tell the listener if the info changed."""
+        info = self.info()
+        if info == self._published_info:
+            return
+        self._published_info = info
+        self._info_snapshot = None
+        if self._on_change is None:
+            return
+        try:
+            self._on_change(info)
+        except Exception:
+            logger.exception("Stream change listener failed for stream %s", self.id)
+
     async def _sleep(self, seconds: float) -> None:
+        # Every poll ends here, so this is where its state changes get published.
+        self._notify_changed()
         if seconds <= 0:
             await asyncio.sleep(0)
             return
         try:
-            await asyncio.wait_for(self._stop_event.wait(), timeout=seconds)
+            if _HAS_ASYNCIO_TIMEOUT:
+                # Cancels the wait in place instead of wrapping it in a new task.
+                async with asyncio.timeout(seconds):
+                    await self._stop_event.wait()
+            else:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=seconds)
         except asyncio.TimeoutError:
             pass
+
+
+def _load_init(path: Path) -> Optional[tuple[bytes, Optional[str], Optional[str]]]:
+    """Return a cached init payload with its ETag and Last-Modified, if intact."""
+    try:
+        meta = orjson.loads(path.with_suffix(".json").read_bytes())
+        payload = path.read_bytes()
+    except (OSError, orjson.JSONDecodeError):
+        return None
+    if not isinstance(meta, dict) or meta.get("size") != len(payload):
+        return None
+    if not (meta.get("etag") or meta.get("last_modified")):
+        return None
+    return payload, meta.get("etag"), meta.get("last_modified")
+
+
+def _touch_init(path: Path) -> None:
+    # Pruning evicts the least recently used entries first.
+    with contextlib.suppress(OSError):
+        path.touch()
+
+
+def _store_init(
+    path: Path, payload: bytes, etag: Optional[str], last_modified: Optional[str]
+) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    meta_path = path.with_suffix(".json")
+    # Drop the old metadata first so a crash mid-write never pairs it with
+    # the new payload.
+    meta_path.unlink(missing_ok=True)
+    partial = path.with_suffix(".part")
+    partial.write_bytes(payload)
+    partial.replace(path)
+    meta = {"size": len(payload), "etag": etag, "last_modified": last_modified}
+    partial.write_bytes(orjson.dumps(meta))
+    partial.replace(meta_path)
+    _prune_init_cache(path.parent, INIT_CACHE_MAX_ENTRIES)
+
+
+def _prune_init_cache(directory: Path, max_entries: int) -> None:
+    """Delete the least recently used entries beyond ``max_entries``."""
+    entries = []
+    for entry in directory.iterdir():
+        if entry.suffix:
+            continue
+        with contextlib.suppress(FileNotFoundError):
+            entries.append((entry.stat().st_mtime, entry))
+    if len(entries) <= max_entries:
+        return
+    entries.sort()
+    for _, entry in entries[: len(entries) - max_entries]:
+        entry.with_suffix(".json").unlink(missing_ok=True)
+        entry.unlink(missing_ok=True)
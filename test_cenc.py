@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""Test in-process CENC decryption on synthetic fragmented MP4 segments."""
+
+import asyncio
+import struct
+import sys
+
+from Crypto.Cipher import AES
+
+KID = "00112233445566778899aabbccddeeff"
+KEY = "0f0e0d0c0b0a09080706050403020100"
+
+
+def _box(box_type, *payload):
+    body = b"".join(payload)
+    return struct.pack(">I4s", 8 + len(body), box_type) + body
+
+
+def _full_box(box_type, version, flags, *payload):
+    return _box(box_type, struct.pack(">I", (version << 24) | flags), *payload)
+
+
+def _init_segment(iv_size=8, protected=True, track_ids=(1,)):
+    tenc = _full_box(b"tenc", 0, 0, b"\0\0", bytes([int(protected), iv_size]), bytes.fromhex(KID))
+    sinf = _box(
+        b"sinf",
+        _box(b"frma", b"avc1"),
+        _full_box(b"schm", 0, 0, b"cenc", struct.pack(">I", 0x10000)),
+        _box(b"schi", tenc),
+    )
+    encv = _box(b"encv", bytes(78), _box(b"avcC", b"\x01"), sinf)
+    stsd = _full_box(b"stsd", 0, 0, struct.pack(">I", 1), encv)
+    traks = [
+        _box(
+            b"trak",
+            _full_box(b"tkhd", 0, 3, bytes(8), struct.pack(">I", track_id), bytes(68)),
+            _box(b"mdia", _box(b"minf", _box(b"stbl", stsd))),
+        )
+        for track_id in track_ids
+    ]
+    pssh = _full_box(b"pssh", 0, 0, bytes(16), struct.pack(">I", 0))
+    return _box(b"ftyp", b"iso6") + _box(b"moov", *traks, pssh)
+
+
+def _media_segment(samples, ivs, subsamples, with_senc=True):
+    key = bytes.fromhex(KEY)
+    encrypted = []
+    for sample, iv, ranges in zip(samples, ivs, subsamples):
+        cipher = AES.new(key, AES.MODE_CTR, initial_value=iv.ljust(16, b"\0"), nonce=b"")
+        if ranges is None:
+            encrypted.append(cipher.encrypt(sample))
+            continue
+        out, pos = bytearray(sample), 0
+        spans = []
+        for clear, protected in ranges:
+            pos += clear
+            spans.append((pos, pos + protected))
+            pos += protected
+        stream = cipher.encrypt(b"".join(sample[a:b] for a, b in spans))
+        used = 0
+        for a, b in spans:
+            out[a:b] = stream[used:used + b - a]
+            used += b - a
+        encrypted.append(bytes(out))
+
+    flags = 0x2 if subsamples[0] is not None else 0
+    senc_body = struct.pack(">I", len(samples))
+    for iv, ranges in zip(ivs, subsamples):
+        senc_body += iv
+        if ranges is not None:
+            senc_body += struct.pack(">H", len(ranges))
+            senc_body += b"".join(struct.pack(">HI", c, p) for c, p in ranges)
+
+    def moof(data_offset):
+        trun = _full_box(
+            b"trun", 0, 0x201, struct.pack(">Ii", len(samples), data_offset),
+            b"".join(struct.pack(">I", len(s)) for s in samples),
+        )
+        traf = _box(
+            b"traf",
+            _full_box(b"tfhd", 0, 0x20000, struct.pack(">I", 1)),
+            trun,
+            *([_full_box(b"senc", 0, flags, senc_body)] if with_senc else []),
+        )
+        return _box(b"moof", _full_box(b"mfhd", 0, 0, struct.pack(">I", 1)), traf)
+
+    header = moof(0)
+    header = moof(len(header) + 8)
+    mdat = _box(b"mdat", *encrypted)
+    return _box(b"styp", b"msdh") + header + mdat, len(_box(b"styp", b"msdh")) + len(header) + 8
+
+
+def test_clear_init_segment():
+    """Test that protected sample entries are restored and protection boxes hidden."""
+    from dash2hls.cenc import clear_init_segment
+
+    data = _init_segment()
+    clear, tracks = clear_init_segment(data)
+    assert len(clear) == len(data)
+    assert b"avc1" in clear and b"encv" not in clear
+    assert b"sinf" not in clear and b"pssh" not in clear
+    assert [(t.track_id, t.scheme, t.kid, t.iv_size) for t in tracks] == [(1, "cenc", KID, 8)]
+    print("✓ CENC init segment test passed")
+
+
+def test_decrypt_media_segment():
+    """Test decryption with subsamples (8-byte IVs) and whole samples (16-byte IVs)."""
+    from dash2hls.decryptor import CencDecryptor
+
+    samples = [bytes(range(256)) * 3, b"\x42" * 100]
+
+    for iv_size, subsamples in ((8, [[(5, 300), (10, 100)], [(100, 0)]]), (16, [None, None])):
+        ivs = [bytes([i + 1]) * iv_size for i in range(len(samples))]
+        segment, mdat_start = _media_segment(samples, ivs, subsamples)
+
+        decryptor = CencDecryptor({KID: KEY})
+        init = asyncio.run(decryptor.decrypt_segment(_init_segment(iv_size), kid=KID))
+        assert b"avc1" in init
+
+        clear = asyncio.run(decryptor.decrypt_segment(segment, kid=KID))
+        assert clear[mdat_start:] == b"".join(samples)
+        assert b"senc" not in clear
+    print("✓ CENC media segment test passed")
+
+
+def test_tracks_sharing_a_kid_keep_their_own_parameters():
+    """Test that video and audio with one KID but different IV sizes both decrypt."""
+    from dash2hls.decryptor import CencDecryptor
+
+    samples = [b"\x17" * 64]
+    decryptor = CencDecryptor({KID: KEY})
+    segments = {}
+    for track, iv_size in (("video", 8), ("audio", 16)):
+        asyncio.run(decryptor.decrypt_segment(_init_segment(iv_size), kid=KID, track=track))
+        segments[track] = _media_segment(samples, [b"\x05" * iv_size], [None])
+
+    for track, (segment, mdat_start) in segments.items():
+        clear = asyncio.run(decryptor.decrypt_segment(segment, kid=KID, track=track))
+        assert clear[mdat_start:] == b"".join(samples), track
+    print("✓ CENC shared KID test passed")
+
+
+def test_protection_without_senc():
+    """Test that protected fragments lacking senc fail and unprotected tracks pass through."""
+    from dash2hls.decryptor import CencDecryptor, DecryptionError
+
+    samples = [b"\x17" * 64]
+    segment, _ = _media_segment(samples, [b"\x05" * 8], [None], with_senc=False)
+
+    decryptor = CencDecryptor({KID: KEY})
+    asyncio.run(decryptor.decrypt_segment(_init_segment(), kid=KID))
+    try:
+        asyncio.run(decryptor.decrypt_segment(segment, kid=KID))
+    except DecryptionError:
+        pass
+    else:
+        raise AssertionError("A protected fragment without senc must not pass as clear")
+
+    decryptor = CencDecryptor({KID: KEY})
+    asyncio.run(decryptor.decrypt_segment(_init_segment(protected=False), kid=KID))
+    assert asyncio.run(decryptor.decrypt_segment(segment, kid=KID)) == segment
+    print("✓ CENC missing senc test passed")
+
+
+def test_track_fragments_without_explicit_base():
+    """Test that a second traf without a base offset starts after the first one's data."""
+    from dash2hls.decryptor import CencDecryptor
+
+    key = bytes.fromhex(KEY)
+    samples = {1: b"\x11" * 48, 2: b"\x22" * 80}
+    ivs = {1: b"\x01" * 8, 2: b"\x02" * 8}
+    encrypted = {
+        track_id: AES.new(key, AES.MODE_CTR, initial_value=ivs[track_id].ljust(16, b"\0"), nonce=b"")
+        .encrypt(sample)
+        for track_id, sample in samples.items()
+    }
+
+    def moof(data_offset):
+        # tfhd flags 0: neither base-data-offset nor default-base-is-moof.
+        trafs = [
+            _box(
+                b"traf",
+                _full_box(b"tfhd", 0, 0, struct.pack(">I", track_id)),
+                _full_box(
+                    b"trun", 0, 0x201 if track_id == 1 else 0x200, struct.pack(">I", 1),
+                    struct.pack(">i", data_offset) if track_id == 1 else b"",
+                    struct.pack(">I", len(samples[track_id])),
+                ),
+                _full_box(b"senc", 0, 0, struct.pack(">I", 1), ivs[track_id]),
+            )
+            for track_id in (1, 2)
+        ]
+        return _box(b"moof", _full_box(b"mfhd", 0, 0, struct.pack(">I", 1)), *trafs)
+
+    header = moof(len(moof(0)) + 8)
+    segment = header + _box(b"mdat", encrypted[1], encrypted[2])
+
+    decryptor = CencDecryptor({KID: KEY})
+    asyncio.run(decryptor.decrypt_segment(_init_segment(track_ids=(1, 2)), kid=KID))
+    clear = asyncio.run(decryptor.decrypt_segment(segment, kid=KID))
+    assert clear[len(header) + 8:] == samples[1] + samples[2]
+    print("✓ CENC multi-traf test passed")
+
+
+if __name__ == "__main__":
+    test_clear_init_segment()
+    test_decrypt_media_segment()
+    test_tracks_sharing_a_kid_keep_their_own_parameters()
+    test_protection_without_senc()
+    test_track_fragments_without_explicit_base()
+    sys.exit(0)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Test MPD parsing on a multi-Period manifest."""
+
+import sys
+
+MPD_URL = "https://origin.example.com/manifests/stream.mpd"
+
+MULTI_PERIOD_MPD = """<?xml version="1.0" encoding="UTF-8"?>
+<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" xmlns:cenc="urn:mpeg:cenc:2013"
+     type="static" mediaPresentationDuration="PT14S">
+  <!-- comments are dropped by the parser -->
+  <BaseURL>https://cdn.example.com/live/</BaseURL>
+  <Period id="p1" duration="PT6S">
+    <BaseURL>p1/</BaseURL>
+    <AdaptationSet mimeType="video/mp4" contentType="video">
+      <BaseURL>video/</BaseURL>
+      <ContentProtection schemeIdUri="urn:mpeg:dash:mp4protection:2011" value="cenc"
+                         cenc:default_KID="00112233-4455-6677-8899-AABBCCDDEEFF"/>
+      <SegmentTemplate timescale="1000" startNumber="10"
+                       initialization="$RepresentationID$/init.mp4"
+                       media="$RepresentationID$/seg_$Time$.m4s">
+        <SegmentTimeline>
+          <S t="1000" d="2000" r="2"/>
+          <S d="1000"/>
+        </SegmentTimeline>
+      </SegmentTemplate>
+      <Representation id="v1" bandwidth="1000000" width="1280" height="720" codecs="avc1.64001f"/>
+    </AdaptationSet>
+    <AdaptationSet mimeType="audio/mp4" contentType="audio">
+      <Representation id="a1" bandwidth="128000" codecs="mp4a.40.2"
+                      cenc:default_KID="FFEEDDCC-BBAA-9988-7766-554433221100">
+        <BaseURL>audio/</BaseURL>
+        <SegmentTemplate timescale="48000" duration="96000" startNumber="1"
+                         initialization="a_init.mp4" media="a_$Number%05d$.m4s"/>
+      </Representation>
+    </AdaptationSet>
+  </Period>
+  <Period id="p2" duration="PT8S">
+    <BaseURL>https://other.example.com/p2/</BaseURL>
+    <SegmentTemplate timescale="1000" duration="4000"
+                     initialization="$RepresentationID$_init.mp4"
+                     media="$RepresentationID$_$Number$.m4s"/>
+    <AdaptationSet mimeType="video/mp4" contentType="video">
+      <Representation id="v1" bandwidth="2000000" width="1920" height="1080" codecs="avc1.640028">
+        <BaseURL>v/</BaseURL>
+      </Representation>
+    </AdaptationSet>
+  </Period>
+</MPD>
+"""
+
+
+def test_multi_period_manifest():
+    """Test BaseURL inheritance, template expansion and default_KID across Periods."""
+    from dash2hls.dash_parser import DashParser
+
+    manifest = DashParser.parse(MULTI_PERIOD_MPD.encode(), MPD_URL)
+    assert manifest.base_url == "https://cdn.example.com/live/"
+    assert manifest.media_presentation_duration == 14.0
+    assert not manifest.is_live
+    assert [rep.id for rep in manifest.representations] == ["v1", "a1", "v1"]
+
+    video, audio, second_video = manifest.representations
+
+    # MPD -> Period -> AdaptationSet BaseURLs, SegmentTimeline with repeats.
+    base = "https://cdn.example.com/live/p1/video/v1/"
+    assert video.init_url == base + "init.mp4"
+    assert [(s.url, s.duration, s.number) for s in video.segments] == [
+        (base + "seg_1000.m4s", 2.0, 10),
+        (base + "seg_3000.m4s", 2.0, 11),
+        (base + "seg_5000.m4s", 2.0, 12),
+        (base + "seg_7000.m4s", 1.0, 13),
+    ]
+    assert video.default_kid == "00112233445566778899aabbccddeeff"
+    assert (video.width, video.height, video.is_video) == (1280, 720, True)
+
+    # Representation-level BaseURL and template, padded $Number$, KID attribute.
+    base = "https://cdn.example.com/live/p1/audio/"
+    assert audio.init_url == base + "a_init.mp4"
+    assert [s.url for s in audio.segments] == [
+        base + "a_00001.m4s", base + "a_00002.m4s", base + "a_00003.m4s"
+    ]
+    assert audio.default_kid == "ffeeddccbbaa99887766554433221100"
+    assert audio.is_audio and not audio.is_video
+
+    # An absolute Period BaseURL replaces the MPD one; the template is Period-level.
+    base = "https://other.example.com/p2/v/"
+    assert second_video.init_url == base + "v1_init.mp4"
+    assert [(s.url, s.duration) for s in second_video.segments] == [
+        (base + "v1_1.m4s", 4.0), (base + "v1_2.m4s", 4.0)
+    ]
+    assert second_video.default_kid is None
+
+    assert manifest.video_representations == [video, second_video]
+    assert manifest.audio_representations == [audio]
+    assert manifest.representations_by_id == {"v1": video, "a1": audio}
+
+    # Text input parses the same as the raw response body.
+    assert DashParser.parse(MULTI_PERIOD_MPD, MPD_URL) == manifest
+    print("✓ Multi-Period MPD test passed")
+
+
+if __name__ == "__main__":
+    test_multi_period_manifest()
+    sys.exit(0)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Test request payload validation for stream configuration."""
+
+import sys
+
+
+def test_config_from_dict_coerces_numbers():
+    """Test that numeric fields accept JSON numbers and numeric strings."""
+    from dash2hls.models import StreamConfig
+
+    config = StreamConfig.from_dict(
+        {
+            "mpd_url": "https://example.com/manifest.mpd",
+            "poll_interval": 2,
+            "window_size": "8",
+            "keys": {"00112233445566778899aabbccddeeff": "00112233445566778899aabbccddeeff"},
+            "output_dir": "/tmp/out",
+        }
+    )
+
+    assert config.poll_interval == 2.0 and isinstance(config.poll_interval, float)
+    assert config.window_size == 8
+    assert config.key_map == {"00112233445566778899aabbccddeeff": "00112233445566778899aabbccddeeff"}
+    assert str(config.output_dir) == "/tmp/out"
+    print("✓ StreamConfig.from_dict coercion test passed")
+
+
+def test_config_from_dict_rejects_invalid_values():
+    """Test that malformed payloads raise ValueError instead of TypeError."""
+    from dash2hls.models import StreamConfig
+
+    invalid_payloads = [
+        {},
+        {"mpd_url": 42},
+        {"mpd_url": "https://example.com/manifest.mpd", "poll_interval": "soon"},
+        {"mpd_url": "https://example.com/manifest.mpd", "window_size": True},
+        {"mpd_url": "https://example.com/manifest.mpd", "poll_interval": 0},
+        {"mpd_url": "https://example.com/manifest.mpd", "poll_interval": "nan"},
+        {"mpd_url": "https://example.com/manifest.mpd", "poll_interval": "inf"},
+        {"mpd_url": "https://example.com/manifest.mpd", "window_size": 2.9},
+        {"mpd_url": "https://example.com/manifest.mpd", "max_parallel": "1.5"},
+        {"mpd_url": "https://example.com/manifest.mpd", "headers": ["Referer: x"]},
+    ]
+
+    for payload in invalid_payloads:
+        try:
+            StreamConfig.from_dict(payload)
+        except ValueError:
+            continue
+        raise AssertionError(f"payload should have been rejected: {payload!r}")
+    print("✓ StreamConfig.from_dict validation test passed")
+
+
+if __name__ == "__main__":
+    test_config_from_dict_coerces_numbers()
+    test_config_from_dict_rejects_invalid_values()
+    sys.exit(0)
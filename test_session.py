@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""Test segment bookkeeping and the segment pipeline in StreamSession."""
+
+import asyncio
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+
+def _segments(numbers):
+    from dash2hls.dash_parser import DashSegment
+
+    return [DashSegment(url=f"seg_{n}.m4s", duration=2.0, number=n) for n in numbers]
+
+
+def test_collect_new_segments_uses_high_water_mark():
+    """Test that only segments past the last written sequence are collected."""
+    from dash2hls.models import StreamConfig
+    from dash2hls.session import StreamSession
+
+    with TemporaryDirectory() as tmpdir:
+        session = StreamSession("test", StreamConfig(mpd_url="https://example.com/a.mpd"), Path(tmpdir))
+
+        fresh = session._collect_new_segments(_segments(range(1, 6)), track="video")
+        assert [s.number for s in fresh] == [1, 2, 3, 4, 5]
+
+        for segment in fresh[:3]:
+            session._mark_processed("video", segment.number)
+
+        # Sliding live window: old segments dropped, new ones appended.
+        fresh = session._collect_new_segments(_segments(range(2, 9)), track="video")
+        assert [s.number for s in fresh] == [4, 5, 6, 7, 8]
+
+        # Tracks are independent.
+        fresh = session._collect_new_segments(_segments(range(1, 3)), track="audio")
+        assert [s.number for s in fresh] == [1, 2]
+
+        # A stale (older) number never moves the mark backwards.
+        session._mark_processed("video", 2)
+        assert session.info().last_sequence == 3
+    print("✓ StreamSession segment collection test passed")
+
+
+def test_collect_new_segments_handles_gaps():
+    """Test that non-contiguous numbering falls back to a full comparison."""
+    from dash2hls.models import StreamConfig
+    from dash2hls.session import StreamSession
+
+    with TemporaryDirectory() as tmpdir:
+        session = StreamSession("test", StreamConfig(mpd_url="https://example.com/a.mpd"), Path(tmpdir))
+        session._mark_processed("video", 5)
+
+        # Nothing past the mark.
+        assert session._collect_new_segments(_segments([3, 4, 5]), track="video") == []
+
+        # The window jumped ahead of the mark.
+        fresh = session._collect_new_segments(_segments([9, 10, 11]), track="video")
+        assert [s.number for s in fresh] == [9, 10, 11]
+
+        # A hole in the numbering right after the mark.
+        fresh = session._collect_new_segments(_segments([4, 5, 7, 8]), track="video")
+        assert [s.number for s in fresh] == [7, 8]
+    print("✓ StreamSession segment gap test passed")
+
+
+class _InitOrigin:
+    """Stub downloader serving one init segment, with an ETag unless ``validators`` is off."""
+
+    def __init__(self, headers=None):
+        self.headers = headers or {}
+        self.body = b"init-v1"
+        self.validators = True
+        self.requests = []
+
+    async def download_conditional(self, url, *, etag=None, last_modified=None):
+        from dash2hls.downloader import TextResponse
+
+        self.requests.append(etag)
+        tag = self.body.decode() if self.validators else None
+        if etag is not None and etag == tag:
+            return TextResponse(status=304, body=None, etag=etag, last_modified=None)
+        return TextResponse(status=200, body=self.body, etag=tag, last_modified=None)
+
+
+def test_init_cache_is_shared_and_revalidated():
+    """Test that cached init segments are shared, revalidated and kept out of the output."""
+    from dash2hls.models import StreamConfig
+    from dash2hls.session import StreamSession
+
+    with TemporaryDirectory() as tmpdir:
+        base, cache = Path(tmpdir) / "output", Path(tmpdir) / "cache"
+        config = StreamConfig(mpd_url="https://example.com/a.mpd")
+        first = StreamSession("one", config, base, init_cache_dir=cache)
+        second = StreamSession("two", config, base, init_cache_dir=cache)
+        origin = _InitOrigin()
+        url = "https://example.com/init.mp4"
+
+        assert asyncio.run(first._fetch_init(origin, url)) == b"init-v1"
+        # Another stream revalidates the shared entry instead of refetching it.
+        assert asyncio.run(second._fetch_init(origin, url)) == b"init-v1"
+        assert origin.requests == [None, "init-v1"]
+
+        # A changed origin replaces the entry.
+        origin.body = b"init-v2"
+        assert asyncio.run(second._fetch_init(origin, url)) == b"init-v2"
+
+        # A truncated entry is ignored and fetched unconditionally.
+        entry = next(p for p in cache.iterdir() if p.suffix != ".json")
+        entry.write_bytes(b"init")
+        assert asyncio.run(first._fetch_init(origin, url)) == b"init-v2"
+        assert origin.requests[-1] is None
+
+        # Different request headers never share an entry.
+        other = _InitOrigin(headers={"Authorization": "Bearer other"})
+        assert asyncio.run(first._fetch_init(other, url)) == b"init-v1"
+        assert other.requests == [None]
+
+        assert not any(p.is_file() for p in base.rglob("*"))
+    print("✓ StreamSession init cache test passed")
+
+
+def test_init_cache_skips_unvalidated_and_prunes():
+    """Test that responses without validators are not cached and old entries are pruned."""
+    from dash2hls import session as session_module
+    from dash2hls.models import StreamConfig
+    from dash2hls.session import StreamSession
+
+    with TemporaryDirectory() as tmpdir:
+        cache = Path(tmpdir) / "cache"
+        session = StreamSession(
+            "one", StreamConfig(mpd_url="https://example.com/a.mpd"), Path(tmpdir) / "output",
+            init_cache_dir=cache,
+        )
+        origin = _InitOrigin()
+        origin.validators = False
+        for _ in range(2):
+            assert asyncio.run(session._fetch_init(origin, "https://example.com/init.mp4")) == b"init-v1"
+        assert origin.requests == [None, None]
+        assert not cache.exists() or not any(cache.iterdir())
+
+        origin.validators = True
+        limit = session_module.INIT_CACHE_MAX_ENTRIES
+        session_module.INIT_CACHE_MAX_ENTRIES = 2
+        try:
+            for n in range(4):
+                asyncio.run(session._fetch_init(origin, f"https://example.com/init_{n}.mp4"))
+        finally:
+            session_module.INIT_CACHE_MAX_ENTRIES = limit
+        assert len([p for p in cache.iterdir() if not p.suffix]) == 2
+        assert len([p for p in cache.iterdir() if p.suffix == ".json"]) == 2
+    print("✓ StreamSession init cache pruning test passed")
+
+
+class _Downloader:
+    """Stub downloader; later segments finish first and ``failures`` fail once."""
+
+    def __init__(self, failures=(), hang_from=None):
+        self.failures = set(failures)
+        self.hang_from = hang_from
+        self.completed = []
+
+    async def download(self, url):
+        number = int(url.split("_")[1].split(".")[0])
+        if self.hang_from is not None and number >= self.hang_from:
+            await asyncio.Event().wait()
+        await asyncio.sleep(0.001 * (10 - number % 5))
+        if number in self.failures:
+            self.failures.discard(number)
+            raise RuntimeError(f"segment {number} failed")
+        self.completed.append(number)
+        return b"payload-%d" % number
+
+
+class _Decryptor:
+    """Stub decryptor recording the arguments of every batch."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def decrypt_segments(self, payloads, *, kid=None, track=None):
+        self.calls.append((kid, track))
+        return [payload.upper() for payload in payloads]
+
+
+def _pipeline_session(tmpdir, window_size=4):
+    from dash2hls.dash_parser import DashRepresentation
+    from dash2hls.hls_writer import MultiVariantHLSWriter
+    from dash2hls.models import StreamConfig
+    from dash2hls.session import StreamSession
+
+    written = []
+
+    class Writer(MultiVariantHLSWriter):
+        def add_segment(self, name, sequence, duration, payload):
+            written.append((sequence, payload))
+            return super().add_segment(name, sequence, duration, payload)
+
+    config = StreamConfig(mpd_url="https://example.com/a.mpd", window_size=window_size)
+    session = StreamSession("test", config, Path(tmpdir))
+    session._decryptor = _Decryptor()
+    session._hls_writer = Writer(Path(tmpdir), is_live=True, window_size=window_size)
+    session._hls_writer.ensure_variant("video", track_type="video", bandwidth=1, codecs="avc1")
+    representation = DashRepresentation(
+        id="v1", bandwidth=1, codecs="avc1", mime_type="video/mp4", width=None, height=None,
+        init_url="init.mp4", segments=[], is_video=True, is_audio=False, default_kid="kid",
+    )
+    return session, representation, written
+
+
+def test_pipeline_writes_in_order():
+    """Test that segments downloaded out of order are decrypted and written in order."""
+    with TemporaryDirectory() as tmpdir:
+        session, representation, written = _pipeline_session(tmpdir)
+        downloader = _Downloader()
+        segments = _segments(range(1, 9))
+
+        asyncio.run(session._process_track_segments("video", downloader, representation, segments))
+
+        assert downloader.completed != sorted(downloader.completed)
+        assert written == [(n, b"PAYLOAD-%d" % n) for n in range(1, 9)]
+        assert session._last_sequences == {"video": 8, "audio": None}
+        assert set(session._decryptor.calls) == {("kid", "video")}
+    print("✓ StreamSession pipeline order test passed")
+
+
+def test_pipeline_recovers_after_failed_segment():
+    """Test that a failed download keeps earlier segments and the next poll resumes."""
+
+    async def run(session, representation, written):
+        downloader = _Downloader(failures={5})
+        segments = _segments(range(1, 9))
+        try:
+            await session._process_track_segments("video", downloader, representation, segments)
+        except RuntimeError as exc:
+            assert str(exc) == "segment 5 failed"
+        else:
+            raise AssertionError("The failed download must surface")
+        assert [n for n, _ in written] == [1, 2, 3, 4]
+        assert session._last_sequences["video"] == 4
+
+        fresh = session._collect_new_segments(segments, track="video")
+        assert [s.number for s in fresh] == [5, 6, 7, 8]
+        await session._process_track_segments("video", downloader, representation, fresh)
+
+    with TemporaryDirectory() as tmpdir:
+        session, representation, written = _pipeline_session(tmpdir)
+        asyncio.run(run(session, representation, written))
+        assert [n for n, _ in written] == list(range(1, 9))
+        assert session._last_sequences["video"] == 8
+    print("✓ StreamSession pipeline recovery test passed")
+
+
+def test_pipeline_stops_mid_download():
+    """Test that stopping the session cancels in-flight downloads and leaves no tasks."""
+
+    async def run(session, representation):
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.05, session._stop_event.set)
+        started = loop.time()
+        await asyncio.wait_for(
+            session._process_track_segments(
+                "video", _Downloader(hang_from=3), representation, _segments(range(1, 9))
+            ),
+            timeout=2,
+        )
+        assert loop.time() - started < 1
+        assert asyncio.all_tasks() == {asyncio.current_task()}
+
+    with TemporaryDirectory() as tmpdir:
+        session, representation, written = _pipeline_session(tmpdir)
+        asyncio.run(run(session, representation))
+        assert [n for n, _ in written] == [1, 2]
+        assert session._last_sequences["video"] == 2
+    print("✓ StreamSession pipeline stop test passed")
+
+
+if __name__ == "__main__":
+    test_collect_new_segments_uses_high_water_mark()
+    test_collect_new_segments_handles_gaps()
+    test_init_cache_is_shared_and_revalidated()
+    test_init_cache_skips_unvalidated_and_prunes()
+    test_pipeline_writes_in_order()
+    test_pipeline_recovers_after_failed_segment()
+    test_pipeline_stops_mid_download()
+    sys.exit(0)